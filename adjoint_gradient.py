@@ -0,0 +1,78 @@
+from qiskit import transpile
+from qiskit.primitives import Estimator
+from qiskit_algorithms.gradients import BaseEstimatorGradient, EstimatorGradientResult
+import numpy as np
+from collections import OrderedDict
+import hashlib
+import json
+
+from compiled_ansatz import CompiledAnsatz, PauliHamiltonian
+from transpile_cache import circuit_key
+
+# qiskit_algorithms gradient that evaluates all parameter derivatives with the
+# adjoint method of compiled_ansatz (one forward and one backward statevector
+# pass) instead of 2*P estimator calls. Use it as
+#     VQE(estimator=..., ansatz=..., optimizer=SLSQP(), gradient=AdjointEstimatorGradient())
+#
+# The base class already rewrites the circuit so every parameterized gate has
+# its own parameter in SUPPORTED_GATES and applies the chain rule back to the
+# user's parameters; we only differentiate that rewritten circuit.
+#
+# Compiled circuits are cached by their structural hash (transpile_cache's
+# circuit_key) and Hamiltonians by their terms, each in a small LRU, so a
+# long PES scan neither grows them without bound nor hits a stale entry.
+
+# Fixed gates the rewritten circuit is unrolled to before compiling
+BASIS_GATES = ['rx', 'ry', 'rz', 'p', 'cx', 'h', 'x', 'y', 'z', 's', 'sdg', 'sx', 'sxdg']
+# Entries kept in each of the compiled-circuit and Hamiltonian caches
+MAX_CACHED = 16
+
+def _lookup(cache, key, build):
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    value = cache[key] = build()
+    while len(cache) > MAX_CACHED:
+        cache.popitem(last=False)
+    return value
+
+class AdjointEstimatorGradient(BaseEstimatorGradient):
+    SUPPORTED_GATES = ['rx', 'ry', 'rz', 'p']
+
+    def __init__(self):
+        # required by the base class, never called
+        super().__init__(Estimator())
+        self._compiled = OrderedDict()
+        self._hamiltonians = OrderedDict()
+
+    def _compile(self, circuit):
+        key = hashlib.sha256(json.dumps(circuit_key(circuit), sort_keys=True).encode()).hexdigest()
+        return _lookup(self._compiled, key, lambda: CompiledAnsatz(
+            transpile(circuit, basis_gates=BASIS_GATES, optimization_level=0)))
+
+    def _hamiltonian(self, observable):
+        return _lookup(self._hamiltonians, tuple(observable.to_list()), lambda: PauliHamiltonian(observable))
+
+    def _run(self, circuits, observables, parameter_values, parameters, **options):
+        g_circuits, g_parameter_values, g_parameters = self._preprocess(
+            circuits, parameter_values, parameters, self.SUPPORTED_GATES
+        )
+        results = self._run_unique(g_circuits, observables, g_parameter_values, g_parameters, **options)
+        return self._postprocess(results, circuits, parameter_values, parameters)
+
+    def _run_unique(self, circuits, observables, parameter_values, parameters, **options):
+        gradients, metadata = [], []
+        for circuit, observable, values, parameters_ in zip(
+            circuits, observables, parameter_values, parameters
+        ):
+            # a cache hit may come from an equal circuit built with other
+            # Parameter objects, so parameters are matched by name
+            ansatz = self._compile(circuit)
+            bound = {p.name: v for p, v in zip(circuit.parameters, values)}
+            compiled_values = [bound[p.name] for p in ansatz.parameters]
+            _, gradient = ansatz.energy_and_gradient(compiled_values, self._hamiltonian(observable))
+            index = {p.name: i for i, p in enumerate(ansatz.parameters)}
+            gradients.append(np.array([gradient[0, index[p.name]] if p.name in index else 0.0
+                                       for p in parameters_]))
+            metadata.append({'parameters': parameters_})
+        return EstimatorGradientResult(gradients=gradients, metadata=metadata, options={})
@@ -0,0 +1,173 @@
+from qiskit_aer import AerSimulator
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import multiprocessing
+import json
+import platform
+import os
+import resource
+import sys
+import time
+
+import tableau_sim
+from counts import Counts
+from kg1 import choose_method, create_clifford_circuit, create_non_clifford_circuit
+
+# Benchmark suite for the kg1 circuit families. Unlike simulate_circuit, every
+# case gets warmup runs (first-call JIT / thread-pool start-up is discarded),
+# several timed repeats with perf_counter_ns, and median/IQR statistics. The
+# simulator's own time_taken is kept apart from the Python-side overhead of
+# job submission and result parsing. Results can be saved as a JSON baseline
+# and later runs diffed against it.
+#
+# ru_maxrss is a process's all-time peak, so by default every case runs in a
+# fresh worker process and its peak_rss_mb is that case's own (interpreter
+# and imports included). With isolate=False the cases share this process and
+# peak_rss_mb is the process peak so far ('peak_rss_scope' says which).
+
+WARMUP = 2
+REPEATS = 10
+# A case regresses when its median is this much slower than the baseline
+# median and also above the baseline's upper quartile
+REGRESSION_RATIO = 1.10
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+def summarize(samples_ns):
+    s = np.asarray(samples_ns, dtype=float) / 1e9
+    q1, median, q3 = np.percentile(s, [25, 50, 75])
+    return {'median': median, 'iqr': q3 - q1, 'q1': q1, 'q3': q3, 'min': s.min(), 'repeats': len(s)}
+
+def _run_aer(qc, simulator, method, shots):
+    start = time.perf_counter_ns()
+    result = simulator.run(qc, shots=shots, method=method).result()
+    Counts.from_result(result)
+    total = time.perf_counter_ns() - start
+    return total, int(result.results[0].time_taken * 1e9)
+
+def _run_tableau(qc, shots):
+    start = time.perf_counter_ns()
+    tableau_sim.run_circuit(qc, shots=shots)
+    total = time.perf_counter_ns() - start
+    return total, total
+
+# Time one circuit with one method; method='numpy_tableau' uses tableau_sim
+def bench_circuit(qc, simulator, method, shots=1024, warmup=WARMUP, repeats=REPEATS):
+    if method == 'numpy_tableau':
+        run = lambda: _run_tableau(qc, shots)
+    else:
+        run = lambda: _run_aer(qc, simulator, method, shots)
+    for _ in range(warmup):
+        run()
+    totals, sims = [], []
+    for _ in range(repeats):
+        total, sim = run()
+        totals.append(total)
+        sims.append(sim)
+    overhead = [t - s for t, s in zip(totals, sims)]
+    return {
+        'total': summarize(totals),
+        'simulator': summarize(sims),
+        'overhead': summarize(overhead),
+        'peak_rss_mb': _peak_rss_mb(),
+        'peak_rss_scope': 'process',
+    }
+
+def case_name(kind, n, method):
+    return f"{kind}/{n}/{method}"
+
+def _build(kind, n):
+    return create_clifford_circuit(n) if kind == 'clifford' else create_non_clifford_circuit(n)
+
+# One case in a fresh worker process
+def _isolated_case(kind, n, method, shots, warmup, repeats):
+    record = bench_circuit(_build(kind, n), AerSimulator(max_memory_mb=32768), method, shots, warmup, repeats)
+    record['peak_rss_scope'] = 'case'
+    return record
+
+def _run_isolated(kind, n, method, shots, warmup, repeats):
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(_isolated_case, kind, n, method, shots, warmup, repeats).result()
+
+def run_suite(qubit_list, shots=1024, warmup=WARMUP, repeats=REPEATS, include_tableau=True, isolate=True):
+    sim = None if isolate else AerSimulator(max_memory_mb=32768)
+    cases = {}
+    for n in qubit_list:
+        for kind in ('clifford', 'non_clifford'):
+            qc = _build(kind, n)
+            methods = [choose_method(qc)]
+            if include_tableau and kind == 'clifford':
+                methods.append('numpy_tableau')
+            for method in methods:
+                if isolate:
+                    record = _run_isolated(kind, n, method, shots, warmup, repeats)
+                else:
+                    record = bench_circuit(qc, sim, method, shots, warmup, repeats)
+                record.update({'kind': kind, 'num_qubits': n, 'method': method})
+                cases[case_name(kind, n, method)] = record
+                print(f"{case_name(kind, n, method):40s} median {record['total']['median']:.6f}s "
+                      f"IQR {record['total']['iqr']:.6f}s (sim {record['simulator']['median']:.6f}s, "
+                      f"overhead {record['overhead']['median']:.6f}s)")
+    return cases
+
+def machine_info():
+    import qiskit
+    import qiskit_aer
+    return {
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'qiskit': qiskit.__version__,
+        'qiskit_aer': qiskit_aer.__version__,
+    }
+
+def save_baseline(cases, path, shots=1024):
+    with open(path, 'w') as f:
+        json.dump({'machine': machine_info(), 'shots': shots, 'cases': cases}, f, indent=2)
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+# Diff a run against a saved baseline; returns the names of regressed cases
+def compare(cases, baseline, ratio=REGRESSION_RATIO):
+    regressions = []
+    for name, record in cases.items():
+        base = baseline['cases'].get(name)
+        if base is None:
+            print(f"{name:40s} (not in baseline)")
+            continue
+        now, before = record['total']['median'], base['total']['median']
+        change = now / before if before > 0 else float('inf')
+        regressed = change > ratio and now > base['total']['q3']
+        flag = '  REGRESSION' if regressed else ''
+        print(f"{name:40s} {before:.6f}s -> {now:.6f}s ({change:.2f}x){flag}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the kg1 circuit families")
+    parser.add_argument('--qubits', type=int, nargs='+', default=[2, 4, 8, 12, 16, 20, 24])
+    parser.add_argument('--shots', type=int, default=1024)
+    parser.add_argument('--warmup', type=int, default=WARMUP)
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    parser.add_argument('--save', help="write the results as a JSON baseline")
+    parser.add_argument('--compare', help="diff the results against a JSON baseline")
+    parser.add_argument('--no-isolate', action='store_true',
+                        help="run all cases in this process (peak memory is then the process peak)")
+    args = parser.parse_args()
+
+    cases = run_suite(args.qubits, args.shots, args.warmup, args.repeats, isolate=not args.no_isolate)
+    if args.save:
+        save_baseline(cases, args.save, args.shots)
+    if args.compare:
+        regressions = compare(cases, load_baseline(args.compare))
+        if regressions:
+            sys.exit(1)
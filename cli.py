@@ -0,0 +1,258 @@
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import socket
+import sys
+import time
+
+# Single entry point for the simulations:
+#     python cli.py clifford-sweep --qubits 2 10 30
+#     python cli.py vqe | h2-ground | h2-excited | trotter ...
+# Only argparse and the standard library are imported up front; each
+# subcommand imports the modules it needs when it runs (qiskit_aer only for
+# the Aer sweep, qiskit_nature / pyscf only for the H2 commands) and none of
+# them import matplotlib or ASE.
+#
+# For many short jobs, `python cli.py serve --socket PATH` keeps one warm
+# process (modules imported, in-process caches filled) and runs jobs sent by
+# `python cli.py --connect PATH <subcommand> ...` one at a time; `serve
+# --stdio` does the same over stdin / stdout. Jobs and replies are one JSON
+# object per line: {"argv": [...]} in, {"ok", "result", "output", "error",
+# "seconds"} out.
+
+# Modules a warm worker imports up front for each subcommand
+PRELOAD = {
+    'clifford-sweep': ['qiskit_aer', 'kg1', 'tableau_sim'],
+    'vqe': ['vqe'],
+    'h2-ground': ['qch2', 'reduction'],
+    'h2-excited': ['qch222'],
+    'trotter': ['trotter'],
+}
+
+def clifford_sweep(args):
+    from kg1 import create_clifford_circuit, run_sweep
+    rows = []
+    if args.method == 'tableau':
+        import tableau_sim
+        for n in args.qubits:
+            _, elapsed = tableau_sim.simulate_circuit(create_clifford_circuit(n), shots=args.shots)
+            rows.append({'kind': 'clifford', 'num_qubits': n, 'seconds': elapsed, 'method': 'numpy_tableau'})
+    else:
+        if args.store:
+            from job_queue import ResultStore, resumable_sweep
+            sweep = resumable_sweep(args.qubits, ResultStore(args.store), shots=args.shots,
+                                    max_jobs=args.max_jobs)
+        else:
+            from qiskit_aer import AerSimulator
+            sweep = run_sweep(args.qubits, AerSimulator(), shots=args.shots)
+        for (kind, n), (_, elapsed, method, _) in sorted(sweep.items(), key=lambda item: item[0][1]):
+            rows.append({'kind': kind, 'num_qubits': n, 'seconds': elapsed, 'method': method})
+    for row in rows:
+        print(f"{row['kind']:>12} {row['num_qubits']:>4} qubits {row['seconds']:.4f}s [{row['method']}]")
+    return rows
+
+def vqe(args):
+    import vqe
+    result = vqe.run(args.initial)
+    print("Optimal parameters:", result.x)
+    print("Estimated ground state energy:", result.fun)
+    return {'energy': float(result.fun), 'parameters': [float(x) for x in result.x]}
+
+def h2_ground(args):
+    from qch2 import build_ansatz, build_problem, build_vqe, solve, solve_subspace
+    from reduction import active_space, print_report, reduce_problem
+    if args.subspace:
+        energy, subspace, _ = solve_subspace(active_space(build_problem(args.distance)))
+        print(f"Particle-number sector: {subspace.basis.dim} of {2 ** subspace.basis.num_qubits} amplitudes")
+        print(f"Ground state energy: {energy:.6f} Ha")
+        return {'distance': args.distance, 'energy': energy, 'amplitudes': subspace.basis.dim}
+    estimator = None
+    if args.precision is not None or args.shots is not None:
+        from grouped_estimator import GroupedShotEstimator
+        estimator = GroupedShotEstimator(precision=args.precision or 1.6e-3, shots=args.shots, seed=args.seed)
+    problem, mapper, report = reduce_problem(build_problem(args.distance),
+                                             two_qubit_reduction=not args.no_taper, taper=not args.no_taper)
+    print_report(report)
+    result = solve(problem, mapper, build_vqe(build_ansatz(problem, mapper), estimator=estimator))
+    energy = float(result.total_energies[0].real)
+    print(f"Ground state energy: {energy:.6f} Ha")
+    return {'distance': args.distance, 'energy': energy, 'qubits': report['stages'][-1]['qubits']}
+
+def h2_excited(args):
+    from qch222 import solve_excited_states
+    energies = [float(e.real) for e in solve_excited_states(args.distance).total_energies]
+    print(f"Ground state: {energies[0]:.6f} Ha")
+    for i, energy in enumerate(energies[1:], start=1):
+        print(f"Excited state {i}: {energy:.6f} Ha (ΔE = {energy - energies[0]:.6f})")
+    return {'distance': args.distance, 'energies': energies}
+
+# 'ZZ:1,IX:1' -> SparsePauliOp
+def _pauli_sum(text):
+    from qiskit.quantum_info import SparsePauliOp
+    terms = []
+    for term in text.split(','):
+        label, _, coeff = term.partition(':')
+        terms.append((label.strip(), float(coeff or 1.0)))
+    return SparsePauliOp.from_list(terms)
+
+def trotter(args):
+    import numpy as np
+    from trotter import MAX_EXACT_QUBITS, TrotterEngine
+    engine = TrotterEngine(_pauli_sum(args.hamiltonian))
+    state = engine.evolve(args.time, args.steps, args.order)
+    probabilities = np.abs(state) ** 2
+    result = {'probabilities': probabilities.tolist()}
+    for index in np.flatnonzero(probabilities > 1e-12)[:16]:
+        print(f"|{index:0{engine.num_qubits}b}⟩ {probabilities[index]:.6f}")
+    if args.observable:
+        from trotter import ObservableSet
+        value = float(ObservableSet([_pauli_sum(args.observable)], engine.num_qubits).evaluate(state)[0])
+        result['expectation'] = value
+        print(f"⟨{args.observable}⟩ = {value:.6f}")
+    if engine.num_qubits <= MAX_EXACT_QUBITS:
+        result['error'] = engine.trotter_error(args.time, args.steps, args.order)
+        print(f"Trotter error vs exact evolution: {result['error']['norm']:.2e}")
+    return result
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Quantum-Computing simulations")
+    parser.add_argument('--connect', metavar='SOCKET', help="run the command on a warm worker")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('clifford-sweep', help="Clifford / non-Clifford timing sweep (kg1)")
+    p.add_argument('--qubits', type=int, nargs='+', default=[2, 4, 8, 16, 30])
+    p.add_argument('--shots', type=int, default=1024)
+    p.add_argument('--method', choices=['aer', 'tableau'], default='aer')
+    p.add_argument('--store', help="SQLite result store; finished experiments are not re-run")
+    p.add_argument('--max-jobs', type=int, help="concurrent jobs with --store (default: CPU count)")
+    p.set_defaults(run=clifford_sweep)
+
+    p = commands.add_parser('vqe', help="two-qubit toy VQE (vqe.py)")
+    p.add_argument('--initial', type=float, nargs=2, default=[0.1, 0.1])
+    p.set_defaults(run=vqe)
+
+    p = commands.add_parser('h2-ground', help="H2 ground state with VQE (qch2.py)")
+    p.add_argument('--distance', type=float, default=0.735)
+    p.add_argument('--precision', type=float)
+    p.add_argument('--shots', type=int)
+    p.add_argument('--seed', type=int)
+    p.add_argument('--no-taper', action='store_true')
+    p.add_argument('--subspace', action='store_true', help="simulate in the particle-number sector")
+    p.set_defaults(run=h2_ground)
+
+    p = commands.add_parser('h2-excited', help="H2 excited states with QEOM (qch222.py)")
+    p.add_argument('--distance', type=float, default=0.735)
+    p.set_defaults(run=h2_excited)
+
+    p = commands.add_parser('trotter', help="Trotterized time evolution (trotter.py)")
+    p.add_argument('--hamiltonian', default='ZZ:1,IX:1', help="comma-separated LABEL:COEFF terms")
+    p.add_argument('--time', type=float, default=1.0)
+    p.add_argument('--steps', type=int, default=100)
+    p.add_argument('--order', type=int, choices=[1, 2], default=2)
+    p.add_argument('--observable', help="e.g. ZZ:1")
+    p.set_defaults(run=trotter)
+
+    p = commands.add_parser('serve', help="persistent worker with the imports kept warm")
+    where = p.add_mutually_exclusive_group(required=True)
+    where.add_argument('--socket', help="path of the Unix socket to listen on")
+    where.add_argument('--stdio', action='store_true', help="read jobs from stdin, reply on stdout")
+    p.add_argument('--preload', nargs='*', default=list(PRELOAD), choices=list(PRELOAD))
+    p.set_defaults(run=None)
+    return parser
+
+# One job in this process; the command's printed output is captured
+def run_job(argv):
+    start = time.perf_counter()
+    output = io.StringIO()
+    reply = {'ok': False, 'result': None, 'error': None}
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            args = build_parser().parse_args(argv)
+            if args.run is None or args.connect:
+                raise ValueError("workers only run simulation subcommands")
+            reply['result'] = args.run(args)
+        reply['ok'] = True
+    except SystemExit as exc:
+        reply['error'] = f"exit status {exc.code}"
+    except Exception as exc:
+        reply['error'] = f"{type(exc).__name__}: {exc}"
+    reply['output'] = output.getvalue()
+    reply['seconds'] = time.perf_counter() - start
+    return reply
+
+def _serve_lines(read_line, write_line):
+    while True:
+        line = read_line()
+        if not line:
+            return
+        if not line.strip():
+            continue
+        try:
+            argv = json.loads(line)['argv']
+        except (ValueError, KeyError, TypeError) as exc:
+            write_line(json.dumps({'ok': False, 'error': f"bad request: {exc}"}))
+            continue
+        write_line(json.dumps(run_job(argv), default=str))
+
+def serve(args):
+    for command in args.preload:
+        try:
+            for module in PRELOAD[command]:
+                importlib.import_module(module)
+        except ImportError as exc:
+            print(f"not preloading {command}: {exc}", file=sys.stderr)
+    if args.stdio:
+        stdout = sys.stdout
+        def write_line(text):
+            stdout.write(text + '\n')
+            stdout.flush()
+        return _serve_lines(sys.stdin.readline, write_line)
+
+    if os.path.exists(args.socket):
+        os.remove(args.socket)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(args.socket)
+    server.listen()
+    print(f"worker ready on {args.socket}", file=sys.stderr)
+    try:
+        while True:
+            conn, _ = server.accept()
+            with conn, conn.makefile('rw') as stream:
+                def write_line(text):
+                    stream.write(text + '\n')
+                    stream.flush()
+                _serve_lines(stream.readline, write_line)
+    finally:
+        server.close()
+        os.remove(args.socket)
+
+# Send one job to a worker and wait for its reply
+def submit(socket_path, argv):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(socket_path)
+        with conn.makefile('rw') as stream:
+            stream.write(json.dumps({'argv': argv}) + '\n')
+            stream.flush()
+            conn.shutdown(socket.SHUT_WR)
+            return json.loads(stream.readline())
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    args = build_parser().parse_args(argv)
+    if args.command == 'serve':
+        return serve(args)
+    if args.connect:
+        reply = submit(args.connect, argv[argv.index(args.command):])
+        sys.stdout.write(reply.get('output', ''))
+        if not reply['ok']:
+            print(f"worker: {reply['error']}", file=sys.stderr)
+            return 1
+        return 0
+    args.run(args)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
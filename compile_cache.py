@@ -0,0 +1,249 @@
+from qiskit import qpy, transpile
+from qiskit.quantum_info import PauliList, SparsePauliOp
+from qiskit_nature.second_q.mappers import (
+    BravyiKitaevMapper, JordanWignerMapper, ParityMapper, TaperedQubitMapper
+)
+from collections import OrderedDict
+import numpy as np
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+from adjoint_gradient import BASIS_GATES
+from profiling import stage
+from pyscf_cache import evict
+
+# Memoization of the symbolic half of the chemistry pipeline. Mapping a
+# FermionicOp to qubits, generating the UCCSD excitation list and building +
+# transpiling the HartreeFock/UCCSD circuit are deterministic for a given
+# (operator, orbitals, particles, mapper), so their results are kept
+#   1. in an in-process LRU (MAX_MEMORY_ENTRIES), and
+#   2. on disk, one directory per SHA-256 key laid out like pyscf_cache:
+#      packed Pauli x/z bits + coefficients as .npy, excitation lists as
+#      JSON and circuits as QPY, next to a manifest.json.
+#
+# The cached mappers are drop-in subclasses of the qiskit-nature mappers, so
+# GroundStateEigensolver, QEOM and HartreeFock/UCCSD all hit the cache for
+# every operator they map without any change on their side.
+
+CACHE_DIR = os.environ.get(
+    'COMPILE_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'quantum-computing', 'compiled')
+)
+MAX_CACHE_BYTES = 1024 ** 3
+MAX_MEMORY_ENTRIES = 4096
+# Bump when the on-disk layout changes so stale entries are never read
+FORMAT_VERSION = 1
+
+# Where lookups were answered from: 'memory', 'disk' or 'miss'
+STATS = {'memory': 0, 'disk': 0, 'miss': 0}
+
+_memory = OrderedDict()
+
+def _recall(key):
+    if key in _memory:
+        _memory.move_to_end(key)
+        return _memory[key]
+    return None
+
+def _remember(key, value):
+    _memory[key] = value
+    _memory.move_to_end(key)
+    while len(_memory) > MAX_MEMORY_ENTRIES:
+        _memory.popitem(last=False)
+
+def clear_memory():
+    _memory.clear()
+
+def _digest(kind, inputs):
+    import qiskit
+    import qiskit_nature
+    inputs = dict(inputs, kind=kind, format=FORMAT_VERSION, qiskit=qiskit.__version__,
+                  qiskit_nature=qiskit_nature.__version__)
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+# Everything about a mapper that changes its output; a tapered mapper is
+# its inner mapper plus the symmetries and sector it removes
+def mapper_key(mapper):
+    if isinstance(mapper, TaperedQubitMapper):
+        z2 = mapper.z2symmetries
+        tapering_values = z2.tapering_values
+        return {'mapper': 'TaperedQubitMapper',
+                'inner': mapper_key(mapper.mapper),
+                'symmetries': [p.to_label() for p in z2.symmetries],
+                'sq_paulis': [p.to_label() for p in z2.sq_paulis],
+                'sq_list': [int(q) for q in z2.sq_list],
+                'tapering_values': [int(v) for v in tapering_values] if tapering_values is not None else None}
+    for cls in (ParityMapper, BravyiKitaevMapper, JordanWignerMapper):
+        if isinstance(mapper, cls):
+            num_particles = getattr(mapper, 'num_particles', None)
+            return {'mapper': cls.__name__,
+                    'num_particles': list(num_particles) if num_particles is not None else None}
+    raise ValueError(f"mapper {type(mapper).__name__} cannot be cached")
+
+def operator_key(second_q_op, mapper, register_length=None):
+    terms = sorted((label, complex(coeff).real, complex(coeff).imag)
+                   for label, coeff in second_q_op.items())
+    return _digest('operator', {
+        'type': type(second_q_op).__name__,
+        'register_length': register_length or second_q_op.register_length,
+        'terms': terms,
+        'mapper': mapper_key(mapper),
+    })
+
+# Disk entries are written into a private directory and renamed into place,
+# so concurrent workers never read a half-written entry
+def _store(key, write, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    path = os.path.join(cache_dir, key)
+    if os.path.exists(os.path.join(path, 'manifest.json')):
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = os.path.join(cache_dir, f".{key}.{uuid.uuid4().hex}")
+    os.makedirs(tmp)
+    manifest = write(tmp)
+    with open(os.path.join(tmp, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f)
+    try:
+        os.rename(tmp, path)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+    evict(cache_dir, max_bytes, keep=key)
+
+def _load(key, cache_dir=CACHE_DIR):
+    path = os.path.join(cache_dir, key)
+    manifest = os.path.join(path, 'manifest.json')
+    if not os.path.exists(manifest):
+        return None, None
+    os.utime(manifest)
+    with open(manifest) as f:
+        return path, json.load(f)
+
+# Runs `build` unless `key` is already in memory or on disk
+def _cached(key, build, save, load):
+    value = _recall(key)
+    if value is not None:
+        STATS['memory'] += 1
+        return value
+    path, manifest = _load(key)
+    if manifest is not None:
+        STATS['disk'] += 1
+        value = load(path, manifest)
+    else:
+        STATS['miss'] += 1
+        value = build()
+        if value is None:
+            return None
+        _store(key, lambda directory: save(value, directory))
+    _remember(key, value)
+    return value
+
+def _save_operator(op, directory):
+    np.save(os.path.join(directory, 'x.npy'), np.packbits(op.paulis.x, axis=1))
+    np.save(os.path.join(directory, 'z.npy'), np.packbits(op.paulis.z, axis=1))
+    np.save(os.path.join(directory, 'phase.npy'), op.paulis.phase)
+    np.save(os.path.join(directory, 'coeffs.npy'), op.coeffs)
+    return {'num_qubits': op.num_qubits}
+
+def _load_operator(directory, manifest):
+    n = manifest['num_qubits']
+    x = np.unpackbits(np.load(os.path.join(directory, 'x.npy')), axis=1, count=n).astype(bool)
+    z = np.unpackbits(np.load(os.path.join(directory, 'z.npy')), axis=1, count=n).astype(bool)
+    phase = np.load(os.path.join(directory, 'phase.npy'))
+    coeffs = np.load(os.path.join(directory, 'coeffs.npy'))
+    return SparsePauliOp(PauliList.from_symplectic(z, x, phase), coeffs, copy=False)
+
+
+class _CachedMapping:
+    def _map_single(self, second_q_op, *, register_length=None):
+        return _cached(
+            operator_key(second_q_op, self, register_length),
+            lambda: super(_CachedMapping, self)._map_single(second_q_op, register_length=register_length),
+            _save_operator, _load_operator,
+        )
+
+class CachedParityMapper(_CachedMapping, ParityMapper):
+    pass
+
+class CachedJordanWignerMapper(_CachedMapping, JordanWignerMapper):
+    pass
+
+class CachedBravyiKitaevMapper(_CachedMapping, BravyiKitaevMapper):
+    pass
+
+# Cached equivalent of an existing ParityMapper / JordanWignerMapper /
+# BravyiKitaevMapper; a TaperedQubitMapper gets a cached inner mapper
+def cached_mapper(mapper):
+    if isinstance(mapper, _CachedMapping):
+        return mapper
+    if isinstance(mapper, TaperedQubitMapper):
+        if isinstance(mapper.mapper, _CachedMapping):
+            return mapper
+        return TaperedQubitMapper(cached_mapper(mapper.mapper), mapper.z2symmetries)
+    if isinstance(mapper, ParityMapper):
+        return CachedParityMapper(num_particles=mapper.num_particles)
+    if isinstance(mapper, BravyiKitaevMapper):
+        return CachedBravyiKitaevMapper()
+    if isinstance(mapper, JordanWignerMapper):
+        return CachedJordanWignerMapper()
+    raise ValueError(f"mapper {type(mapper).__name__} cannot be cached")
+
+# UCCSD's default singles + doubles, spin preserving, as a list of
+# (occupied, unoccupied) spin-orbital index tuples
+def excitation_list(num_spatial_orbitals, num_particles):
+    from qiskit_nature.second_q.circuit.library.ansatzes.utils import generate_fermionic_excitations
+
+    def build():
+        return [exc for degree in (1, 2) for exc in generate_fermionic_excitations(
+            degree, num_spatial_orbitals, tuple(num_particles))]
+
+    def save(excitations, directory):
+        return {'excitations': [[list(occ), list(unocc)] for occ, unocc in excitations]}
+
+    def load(directory, manifest):
+        return [(tuple(occ), tuple(unocc)) for occ, unocc in manifest['excitations']]
+
+    key = _digest('excitations', {'num_spatial_orbitals': num_spatial_orbitals,
+                                  'num_particles': list(num_particles)})
+    return _cached(key, build, save, load)
+
+# HartreeFock + UCCSD transpiled to BASIS_GATES, parameters left unbound, so
+# estimators never have to synthesize the evolution gates again
+def uccsd_ansatz(num_spatial_orbitals, num_particles, mapper, optimization_level=1):
+    from qiskit_nature.second_q.circuit.library import HartreeFock, UCC
+
+    def build():
+        excitations = excitation_list(num_spatial_orbitals, num_particles)
+        initial_state = HartreeFock(
+            num_spatial_orbitals=num_spatial_orbitals,
+            num_particles=num_particles,
+            qubit_mapper=mapper,
+        )
+        # UCCSD is UCC with 'sd' excitations; hand it the cached list instead
+        ansatz = UCC(
+            num_spatial_orbitals=num_spatial_orbitals,
+            num_particles=num_particles,
+            excitations=lambda num_spatial_orbitals, num_particles: excitations,
+            qubit_mapper=mapper,
+            initial_state=initial_state,
+        )
+        with stage('transpile'):
+            return transpile(ansatz, basis_gates=BASIS_GATES, optimization_level=optimization_level)
+
+    def save(circuit, directory):
+        with open(os.path.join(directory, 'circuit.qpy'), 'wb') as f:
+            qpy.dump(circuit, f)
+        return {'num_qubits': circuit.num_qubits, 'num_parameters': circuit.num_parameters}
+
+    def load(directory, manifest):
+        with open(os.path.join(directory, 'circuit.qpy'), 'rb') as f:
+            return qpy.load(f)[0]
+
+    key = _digest('uccsd', {
+        'num_spatial_orbitals': num_spatial_orbitals,
+        'num_particles': list(num_particles),
+        'mapper': mapper_key(mapper),
+        'basis_gates': BASIS_GATES,
+        'optimization_level': optimization_level,
+    })
+    return _cached(key, build, save, load)
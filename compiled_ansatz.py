@@ -0,0 +1,236 @@
+import numpy as np
+
+# Compile a parametrized QuantumCircuit once into a fixed list of NumPy gate
+# kernels, and a SparsePauliOp into precomputed index/phase arrays, so that
+# energies <psi(theta)|H|psi(theta)> are evaluated without building circuits,
+# Statevectors or operators on every call. Whole batches of parameter vectors
+# are evaluated together, one state per row of a preallocated buffer.
+#
+# Amplitude index i follows Qiskit's little-endian convention: bit q of i is
+# qubit q.
+
+# Closed-form matrices of the supported rotation gates, vectorized over angles
+def _rx(theta):
+    c, s = np.cos(theta / 2), np.sin(theta / 2)
+    return np.array([[c, -1j * s], [-1j * s, c]])
+
+def _ry(theta):
+    c, s = np.cos(theta / 2), np.sin(theta / 2)
+    return np.array([[c, -s], [s, c]], dtype=complex)
+
+def _rz(theta):
+    z = np.zeros_like(theta)
+    return np.array([[np.exp(-0.5j * theta), z], [z, np.exp(0.5j * theta)]])
+
+def _phase(theta):
+    one, z = np.ones_like(theta), np.zeros_like(theta)
+    return np.array([[one, z], [z, np.exp(1j * theta)]], dtype=complex)
+
+ROTATIONS = {'rx': _rx, 'ry': _ry, 'rz': _rz, 'p': _phase, 'u1': _phase}
+
+# dU/dtheta = F U for each rotation: F = -i/2 G for exp(-i theta G / 2) and
+# F = i|1><1| for the phase gate
+GENERATORS = {
+    'rx': -0.5j * np.array([[0, 1], [1, 0]]),
+    'ry': -0.5j * np.array([[0, -1j], [1j, 0]]),
+    'rz': -0.5j * np.array([[1, 0], [0, -1]]),
+    'p': 1j * np.array([[0, 0], [0, 1]]),
+    'u1': 1j * np.array([[0, 0], [0, 1]]),
+}
+
+# An angle is either a constant or an affine function a*theta[k] + b of one
+# circuit parameter; anything else cannot be turned into a kernel
+def _compile_angle(value, parameters):
+    if not hasattr(value, 'parameters'):
+        return None, 0.0, float(value)
+    if len(value.parameters) != 1:
+        raise ValueError(f"angle {value} must depend on exactly one parameter")
+    (param,) = value.parameters
+    f0, f1, f2 = (float(value.bind({param: x})) for x in (0.0, 1.0, 2.0))
+    if not np.isclose(f2 - f1, f1 - f0):
+        raise ValueError(f"angle {value} is not affine in {param}")
+    return parameters.index(param), f1 - f0, f0
+
+
+class CompiledAnsatz:
+    def __init__(self, circuit):
+        self.num_qubits = circuit.num_qubits
+        self.parameters = list(circuit.parameters)
+        self.num_parameters = len(self.parameters)
+        self._buffers = {}
+        self.kernels = []
+        for inst in circuit.data:
+            op = inst.operation
+            qubits = [circuit.find_bit(q).index for q in inst.qubits]
+            if op.name == 'barrier':
+                continue
+            if op.name in ROTATIONS:
+                index, scale, offset = _compile_angle(op.params[0], self.parameters)
+                self.kernels.append(('rot', op.name, qubits[0], index, scale, offset))
+            elif op.name == 'cx':
+                self.kernels.append(('cx', qubits[0], qubits[1]))
+            elif not op.params and len(qubits) == 1:
+                u = np.asarray(op.to_matrix())
+                self.kernels.append(('fixed1', u, u.conj().T, qubits[0]))
+            elif not op.params and len(qubits) == 2:
+                u = np.asarray(op.to_matrix())
+                self.kernels.append(('fixed2', u.reshape(2, 2, 2, 2),
+                                     u.conj().T.reshape(2, 2, 2, 2), qubits))
+            else:
+                raise ValueError(f"gate '{op.name}' is not supported by CompiledAnsatz")
+
+    def _buffer(self, batch):
+        if batch not in self._buffers:
+            self._buffers[batch] = np.empty((batch, 2 ** self.num_qubits), dtype=complex)
+        return self._buffers[batch]
+
+    # View of the buffer with qubit q on its own axis: (batch, high, 2, low)
+    def _split(self, state, q):
+        return state.reshape(state.shape[0], 2 ** (self.num_qubits - 1 - q), 2, 2 ** q)
+
+    def _apply_1q(self, state, u, q):
+        v = self._split(state, q)
+        a0 = v[:, :, 0, :].copy()
+        a1 = v[:, :, 1, :]
+        # u is (2, 2) or (2, 2, batch); broadcast over the other axes
+        u = u.reshape(2, 2, -1, 1, 1)
+        v[:, :, 0, :] = u[0, 0] * a0 + u[0, 1] * a1
+        v[:, :, 1, :] = u[1, 0] * a0 + u[1, 1] * a1
+
+    def _apply_cx(self, state, c, t):
+        hi, lo = max(c, t), min(c, t)
+        v = state.reshape(state.shape[0], 2 ** (self.num_qubits - 1 - hi), 2,
+                          2 ** (hi - lo - 1), 2, 2 ** lo)
+        if c > t:
+            a, b = v[:, :, 1, :, 0, :], v[:, :, 1, :, 1, :]
+        else:
+            a, b = v[:, :, 0, :, 1, :], v[:, :, 1, :, 1, :]
+        tmp = a.copy()
+        a[...] = b
+        b[...] = tmp
+
+    def _apply_2q(self, state, u, qubits):
+        # u[out1, out0, in1, in0] in Qiskit's matrix convention for (q0, q1)
+        q0, q1 = qubits
+        n = self.num_qubits
+        v = state.reshape((state.shape[0],) + (2,) * n)
+        ax0, ax1 = 1 + n - 1 - q0, 1 + n - 1 - q1
+        moved = np.moveaxis(v, (ax1, ax0), (1, 2))
+        out = np.einsum('abcd,xcd...->xab...', u, moved)
+        moved[...] = out
+
+    def _angle(self, kernel, params):
+        _, _, _, index, scale, offset = kernel
+        theta = offset if index is None else scale * params[:, index] + offset
+        return np.asarray(theta, dtype=float)
+
+    def _apply(self, state, kernel, params, inverse=False):
+        kind = kernel[0]
+        if kind == 'rot':
+            theta = self._angle(kernel, params)
+            self._apply_1q(state, ROTATIONS[kernel[1]](-theta if inverse else theta), kernel[2])
+        elif kind == 'cx':
+            self._apply_cx(state, kernel[1], kernel[2])
+        elif kind == 'fixed1':
+            self._apply_1q(state, kernel[2] if inverse else kernel[1], kernel[3])
+        else:
+            self._apply_2q(state, kernel[2] if inverse else kernel[1], kernel[3])
+
+    # Statevectors for a (batch, num_parameters) array, written into the
+    # preallocated buffer for that batch size (reused by the next call)
+    def statevectors(self, params):
+        params = np.atleast_2d(np.asarray(params, dtype=float))
+        state = self._buffer(params.shape[0])
+        state[:] = 0
+        state[:, 0] = 1
+        for kernel in self.kernels:
+            self._apply(state, kernel, params)
+        return state
+
+    # Adjoint differentiation (Jones & Gacon, arXiv:2009.02823): after the
+    # forward pass, phi = psi and lam = H psi are walked backwards through the
+    # circuit together, and every rotation contributes
+    # scale * 2 Re <lam|F|phi> to its parameter's derivative. The full
+    # gradient costs about one forward and one backward pass, independent of
+    # the number of parameters.
+    def energy_and_gradient(self, params, hamiltonian):
+        params = np.atleast_2d(np.asarray(params, dtype=float))
+        phi = self.statevectors(params).copy()
+        lam = hamiltonian.apply(phi)
+        energies = np.einsum('bi,bi->b', phi.conj(), lam).real
+        gradient = np.zeros(params.shape)
+        scratch = np.empty_like(phi)
+        for kernel in reversed(self.kernels):
+            if kernel[0] == 'rot' and kernel[3] is not None:
+                _, name, q, index, scale, _ = kernel
+                scratch[:] = phi
+                self._apply_1q(scratch, GENERATORS[name], q)
+                overlap = np.einsum('bi,bi->b', lam.conj(), scratch)
+                gradient[:, index] += 2 * scale * overlap.real
+            self._apply(phi, kernel, params, inverse=True)
+            self._apply(lam, kernel, params, inverse=True)
+        return energies, gradient
+
+
+class PauliHamiltonian:
+    # For every distinct X-mask x the terms sharing it are folded into one
+    # weight vector w_x, so <psi|H|psi> = sum_x sum_i conj(psi[i ^ x]) w_x[i] psi[i]
+    def __init__(self, op):
+        self.num_qubits = op.num_qubits
+        index = np.arange(2 ** self.num_qubits)
+        weights = {}
+        for label, coeff in op.to_list():
+            phase = 1.0
+            for prefix, factor in (('-i', -1j), ('i', 1j), ('-', -1.0)):
+                if label.startswith(prefix):
+                    label, phase = label[len(prefix):], factor
+                    break
+            x_mask = z_mask = 0
+            for q, char in enumerate(reversed(label)):
+                if char in 'XY':
+                    x_mask |= 1 << q
+                if char in 'ZY':
+                    z_mask |= 1 << q
+                if char == 'Y':
+                    phase *= 1j
+            parity = np.zeros_like(index)
+            for q in range(self.num_qubits):
+                if z_mask >> q & 1:
+                    parity ^= index >> q & 1
+            w = coeff * phase * (1 - 2 * parity)
+            weights[x_mask] = weights.get(x_mask, 0) + w
+        self.terms = [(index ^ x_mask, w) for x_mask, w in weights.items()]
+
+    # Energies for a (batch, 2**n) array of states
+    def expectation(self, states):
+        energy = np.zeros(states.shape[0], dtype=complex)
+        for flipped, w in self.terms:
+            energy += np.einsum('bi,bi->b', states[:, flipped].conj(), w * states)
+        return energy.real
+
+    # H applied to a (batch, 2**n) array of states
+    def apply(self, states):
+        out = np.zeros_like(states)
+        for flipped, w in self.terms:
+            out += (w * states)[:, flipped]
+        return out
+
+
+# Callable energy function: E(params) for one parameter vector returns a float,
+# a (batch, num_parameters) array returns a (batch,) array
+class CompiledEnergy:
+    def __init__(self, circuit, hamiltonian):
+        self.ansatz = CompiledAnsatz(circuit)
+        self.hamiltonian = PauliHamiltonian(hamiltonian)
+
+    def __call__(self, params):
+        params = np.asarray(params, dtype=float)
+        energies = self.hamiltonian.expectation(self.ansatz.statevectors(params))
+        return float(energies[0]) if params.ndim == 1 else energies
+
+    # Analytic gradient via adjoint differentiation; same batching rules as
+    # __call__, so it can be passed straight to scipy.optimize.minimize(jac=...)
+    def gradient(self, params):
+        params = np.asarray(params, dtype=float)
+        _, gradient = self.ansatz.energy_and_gradient(params, self.hamiltonian)
+        return gradient[0] if params.ndim == 1 else gradient
@@ -0,0 +1,211 @@
+import numpy as np
+
+# Measurement counts as NumPy arrays instead of a dict of bitstrings.
+#
+# Every distinct outcome is one row of little-endian uint64 words (bit i of
+# the outcome is clbit i, the same packing as the hex keys Aer returns), with
+# a parallel int64 array of counts; rows are kept unique and sorted. Counts
+# can be built from an Aer result, a get_counts()-style dict, a boolean
+# (shots, clbits) array or packed raw shots (e.g. a memory-mapped .npy), in
+# chunks so memory stays bounded by the number of distinct outcomes.
+# Marginals, merging across batches and top-k selection are vectorized;
+# bitstrings are only formatted for the handful of outcomes that get shown.
+
+# Raw shots are reduced this many at a time
+CHUNK_SHOTS = 1 << 20
+# Outcomes shown by repr() and plot_histogram()
+TOP_K = 16
+
+def _num_words(num_bits):
+    return max((num_bits + 63) // 64, 1)
+
+def _int_to_words(value, num_words):
+    return [(value >> (64 * w)) & 0xFFFFFFFFFFFFFFFF for w in range(num_words)]
+
+def _words_to_int(row):
+    return sum(int(word) << (64 * w) for w, word in enumerate(row))
+
+# Unique sorted rows with their summed counts
+def _reduce(outcomes, counts):
+    if len(outcomes) == 0:
+        return outcomes, counts
+    if outcomes.shape[1] == 1:
+        unique, inverse = np.unique(outcomes[:, 0], return_inverse=True)
+        unique = unique[:, None]
+    else:
+        unique, inverse = np.unique(outcomes, axis=0, return_inverse=True)
+    return unique, np.bincount(inverse.ravel(), weights=counts, minlength=len(unique)).astype(np.int64)
+
+# Pack a boolean (shots, num_bits) array, column i = clbit i, into uint64 rows
+def pack_bits(bits):
+    bits = np.asarray(bits, dtype=bool)
+    packed = np.packbits(bits, axis=1, bitorder='little')
+    pad = 8 * _num_words(bits.shape[1]) - packed.shape[1]
+    if pad:
+        packed = np.pad(packed, ((0, 0), (0, pad)))
+    return np.ascontiguousarray(packed).view('<u8').astype(np.uint64)
+
+
+class Counts:
+    def __init__(self, outcomes, counts, num_bits, creg_sizes=None):
+        outcomes = np.asarray(outcomes, dtype=np.uint64).reshape(-1, _num_words(num_bits))
+        self.outcomes, self.counts = _reduce(outcomes, np.asarray(counts, dtype=np.int64))
+        self.num_bits = num_bits
+        # register sizes, first register first, for get_counts()-style spacing
+        self.creg_sizes = list(creg_sizes) if creg_sizes else [num_bits]
+
+    @classmethod
+    def from_result(cls, result, experiment=0):
+        exp = result.results[experiment]
+        header = exp.header if isinstance(exp.header, dict) else exp.header.to_dict()
+        num_bits = header.get('memory_slots', 0)
+        num_words = _num_words(num_bits)
+        hex_counts = result.data(experiment)['counts']
+        outcomes = np.array([_int_to_words(int(key, 16), num_words) for key in hex_counts],
+                            dtype=np.uint64)
+        creg_sizes = [size for _, size in header.get('creg_sizes', [])]
+        return cls(outcomes, list(hex_counts.values()), num_bits, creg_sizes)
+
+    # From {'bitstring': count}, as returned by get_counts(); spaces between
+    # registers are allowed
+    @classmethod
+    def from_dict(cls, counts):
+        if not counts:
+            return cls(np.empty((0, 1)), [], 0)
+        first = next(iter(counts))
+        creg_sizes = [len(part) for part in reversed(first.split())]
+        num_bits = sum(creg_sizes)
+        num_words = _num_words(num_bits)
+        outcomes = np.array([_int_to_words(int(key.replace(' ', ''), 2), num_words) for key in counts],
+                            dtype=np.uint64)
+        return cls(outcomes, list(counts.values()), num_bits, creg_sizes)
+
+    # From a boolean (shots, num_bits) array with column i = clbit i
+    @classmethod
+    def from_bits(cls, bits, creg_sizes=None, chunk_shots=CHUNK_SHOTS):
+        bits = np.asarray(bits, dtype=bool)
+        num_bits = bits.shape[1]
+        parts = [cls(pack_bits(bits[i:i + chunk_shots]), np.ones(len(bits[i:i + chunk_shots])), num_bits)
+                 for i in range(0, len(bits), chunk_shots)]
+        return cls.merge_all(parts, num_bits, creg_sizes)
+
+    # From packed raw shots, one uint64 row (or a 1-D uint64 array for up to
+    # 64 bits) per shot; np.load(path, mmap_mode='r') works and is streamed
+    @classmethod
+    def from_shots(cls, shots, num_bits, creg_sizes=None, chunk_shots=CHUNK_SHOTS):
+        parts = []
+        for i in range(0, len(shots), chunk_shots):
+            chunk = np.asarray(shots[i:i + chunk_shots], dtype=np.uint64).reshape(-1, _num_words(num_bits))
+            parts.append(cls(chunk, np.ones(len(chunk)), num_bits))
+        return cls.merge_all(parts, num_bits, creg_sizes)
+
+    @classmethod
+    def merge_all(cls, parts, num_bits=None, creg_sizes=None):
+        parts = list(parts)
+        if num_bits is None:
+            num_bits = parts[0].num_bits
+        if creg_sizes is None and parts:
+            creg_sizes = parts[0].creg_sizes
+        if any(part.num_bits != num_bits for part in parts):
+            raise ValueError("cannot merge counts over different numbers of bits")
+        if not parts:
+            return cls(np.empty((0, _num_words(num_bits))), [], num_bits, creg_sizes)
+        return cls(np.concatenate([p.outcomes for p in parts]), np.concatenate([p.counts for p in parts]),
+                   num_bits, creg_sizes)
+
+    # Counts of this batch and `other` added together
+    def merge(self, other):
+        return Counts.merge_all([self, other])
+
+    def __add__(self, other):
+        return self.merge(other)
+
+    def __len__(self):
+        return len(self.counts)
+
+    @property
+    def shots(self):
+        return int(self.counts.sum())
+
+    def probabilities(self):
+        return self.counts / max(self.shots, 1)
+
+    # Value of clbit `index` for every outcome
+    def bit(self, index):
+        return (self.outcomes[:, index // 64] >> np.uint64(index % 64)) & np.uint64(1)
+
+    # Counts over the clbits in `indices`; bit j of the result is clbit
+    # indices[j], as in qiskit.result.marginal_counts
+    def marginal(self, indices):
+        indices = list(indices)
+        outcomes = np.zeros((len(self), _num_words(len(indices))), dtype=np.uint64)
+        for j, index in enumerate(indices):
+            outcomes[:, j // 64] |= self.bit(index) << np.uint64(j % 64)
+        return Counts(outcomes, self.counts, len(indices))
+
+    # Counts of the given outcome rows (0 for outcomes never seen)
+    def counts_of(self, outcomes):
+        outcomes = np.asarray(outcomes, dtype=np.uint64).reshape(-1, self.outcomes.shape[1])
+        joined = np.concatenate([self.outcomes, outcomes])
+        if joined.shape[1] == 1:
+            _, inverse = np.unique(joined[:, 0], return_inverse=True)
+        else:
+            _, inverse = np.unique(joined, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        table = np.zeros(inverse.max(initial=-1) + 1, dtype=np.int64)
+        table[inverse[:len(self)]] = self.counts
+        return table[inverse[len(self):]]
+
+    # (outcome rows, counts) of the k most frequent outcomes, most frequent
+    # first; ties go to the smaller outcome
+    def top_k(self, k=TOP_K):
+        k = min(k, len(self))
+        if k < len(self):
+            candidates = np.argpartition(-self.counts, k - 1)[:k]
+        else:
+            candidates = np.arange(len(self))
+        order = candidates[np.lexsort((candidates, -self.counts[candidates]))]
+        return self.outcomes[order], self.counts[order]
+
+    def most_frequent(self):
+        outcomes, _ = self.top_k(1)
+        return self.bitstrings(outcomes)[0]
+
+    # get_counts()-style bitstrings of the given outcome rows
+    def bitstrings(self, outcomes):
+        labels = []
+        for row in outcomes:
+            bits = format(_words_to_int(row), f'0{self.num_bits}b') if self.num_bits else ''
+            parts, end = [], len(bits)
+            for size in self.creg_sizes:
+                parts.append(bits[end - size:end])
+                end -= size
+            labels.append(' '.join(reversed(parts)))
+        return labels
+
+    # Full {bitstring: count} dict; only for small outcome sets
+    def to_dict(self):
+        return dict(zip(self.bitstrings(self.outcomes), self.counts.tolist()))
+
+    def __repr__(self):
+        outcomes, counts = self.top_k(TOP_K)
+        shown = ', '.join(f"'{label}': {c}" for label, c in zip(self.bitstrings(outcomes), counts.tolist()))
+        more = f", ... {len(self) - len(counts)} more" if len(self) > len(counts) else ''
+        return f"Counts({{{shown}{more}}})"
+
+# Grouped bar chart of several Counts on one axis. The k outcomes with the
+# highest combined count are drawn, and only those are turned into labels.
+def plot_histogram(ax, series, k=TOP_K, width=None):
+    names, parts = list(series), list(series.values())
+    combined = Counts.merge_all(parts)
+    outcomes, _ = combined.top_k(k)
+    labels = combined.bitstrings(outcomes)
+    width = width or 0.8 / len(parts)
+    x = np.arange(len(labels))
+    for i, (name, part) in enumerate(zip(names, parts)):
+        ax.bar(x + i * width, part.counts_of(outcomes), width, label=name)
+    ax.set_xticks(x + width * (len(parts) - 1) / 2)
+    ax.set_xticklabels(labels, rotation=90 if len(labels) > 8 or parts[0].num_bits > 8 else 0)
+    ax.set_xlabel('Outcome')
+    ax.set_ylabel('Counts')
+    return ax
@@ -0,0 +1,121 @@
+from qiskit import QuantumCircuit
+from qiskit.primitives import Estimator, EstimatorResult
+from qiskit.primitives.utils import bound_circuit_to_instruction
+from qiskit.quantum_info import Statevector
+import numpy as np
+
+# Shot-based Estimator that measures like hardware would, but with the Pauli
+# terms grouped. The observable is split into qubit-wise-commuting groups;
+# each group needs a single measurement circuit (one basis change per qubit)
+# and every shot of it is shared by all terms of the group. Shots are drawn
+# from the exact statevector of the bound circuit.
+#
+# Shot budgeting for a target standard error `precision` on <H> follows the
+# usual state-independent estimate: terms are treated as uncorrelated with
+# unit variance, so a group's standard deviation is its coefficient weight
+# w_g = sqrt(sum_i c_i^2). N_g ~ w_g minimizes sum_g w_g^2 / N_g, and the
+# total N = (sum_g w_g / precision)^2 reaches the target. Term-by-term
+# measurement (one circuit per Pauli term, w_i = |c_i|) needs
+# (sum_i |c_i| / precision)^2 shots for the same precision, which is what the
+# savings are reported against.
+
+# Chemical accuracy, 1.6 mHa
+PRECISION = 1.6e-3
+
+# Split a SparsePauliOp into its constant part and qubit-wise-commuting
+# groups. For each group keeps the basis-change circuit, the real
+# coefficients, the value sum_i c_i P_i on every measurement outcome and the
+# coefficient weight.
+def measurement_groups(observable):
+    n = observable.num_qubits
+    outcomes = np.arange(2 ** n)
+    bits = (outcomes[:, None] >> np.arange(n)) & 1
+    constant = 0.0
+    groups = []
+    for group in observable.group_commuting(qubit_wise=True):
+        x, z = group.paulis.x, group.paulis.z
+        coeffs = group.coeffs.real
+        identity = ~(x | z).any(axis=1)
+        constant += coeffs[identity].sum()
+        if identity.all():
+            continue
+        x, z, coeffs = x[~identity], z[~identity], coeffs[~identity]
+        basis = QuantumCircuit(n)
+        for q in range(n):
+            if x[:, q].any():
+                if z[:, q].any():
+                    basis.sdg(q)
+                basis.h(q)
+        signs = 1 - 2 * ((bits @ (x | z).T.astype(int)) % 2)
+        groups.append({'basis': basis, 'coeffs': coeffs, 'values': signs @ coeffs,
+                       'weight': np.sqrt(np.sum(coeffs ** 2))})
+    return constant, groups
+
+# Shots per group for a target precision, or a fixed total split the same
+# way, plus the term-by-term shot count reaching the same precision
+def allocate_shots(groups, precision=PRECISION, shots=None):
+    weights = np.array([g['weight'] for g in groups])
+    term_weights = np.array([abs(c) for g in groups for c in g['coeffs']])
+    if shots is not None:
+        precision = weights.sum() / np.sqrt(shots)
+    group_shots = np.maximum(np.ceil(weights * weights.sum() / precision ** 2), 1).astype(int)
+    term_shots = np.maximum(np.ceil(term_weights * term_weights.sum() / precision ** 2), 1).astype(int)
+    return group_shots, int(term_shots.sum()), len(term_weights)
+
+
+class GroupedShotEstimator(Estimator):
+    def __init__(self, precision=PRECISION, shots=None, seed=None):
+        super().__init__()
+        self.precision = precision
+        self.shots = shots
+        self._rng = np.random.default_rng(seed)
+        self._groups = {}
+        self.totals = {'evaluations': 0, 'circuits': 0, 'shots': 0, 'term_circuits': 0, 'term_shots': 0}
+
+    def _measurement_groups(self, index):
+        if index not in self._groups:
+            constant, groups = measurement_groups(self._observables[index])
+            self._groups[index] = (constant, groups, allocate_shots(groups, self.precision, self.shots))
+        return self._groups[index]
+
+    def _estimate(self, state, constant, groups, allocation):
+        group_shots, term_shots, term_circuits = allocation
+        value, variance = constant, 0.0
+        for g, shots in zip(groups, group_shots):
+            probs = np.abs(state.evolve(g['basis']).data) ** 2
+            counts = self._rng.multinomial(shots, probs / probs.sum())
+            mean = counts @ g['values'] / shots
+            value += mean
+            variance += max(counts @ g['values'] ** 2 / shots - mean ** 2, 0) / shots
+        return value, {
+            'variance': variance,
+            'shots': int(group_shots.sum()),
+            'circuits': len(groups),
+            'term_shots': term_shots,
+            'term_circuits': term_circuits,
+        }
+
+    def _call(self, circuits, observables, parameter_values, **run_options):
+        values, metadata = [], []
+        for i, j, value in zip(circuits, observables, parameter_values):
+            circuit = self._circuits[i]
+            if len(value):
+                circuit = circuit.assign_parameters(dict(zip(self._parameters[i], value)))
+            state = Statevector(bound_circuit_to_instruction(circuit))
+            expectation, metadatum = self._estimate(state, *self._measurement_groups(j))
+            values.append(expectation)
+            metadata.append(metadatum)
+            self.totals['evaluations'] += 1
+            for key in ('circuits', 'shots', 'term_circuits', 'term_shots'):
+                self.totals[key] += metadatum[key]
+        return EstimatorResult(np.array(values), metadata)
+
+    # Circuits and shots saved over term-by-term measurement so far
+    def savings(self):
+        t = self.totals
+        return {
+            'circuits_saved': t['term_circuits'] - t['circuits'],
+            'shots_saved': t['term_shots'] - t['shots'],
+            'circuit_ratio': t['term_circuits'] / max(t['circuits'], 1),
+            'shot_ratio': t['term_shots'] / max(t['shots'], 1),
+        }
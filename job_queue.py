@@ -0,0 +1,322 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import asyncio
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import time
+
+from counts import Counts
+from parallel_sweep import MEMORY_BUDGET_MB, method_memory_bytes
+from transpile_cache import circuit_key
+
+# asyncio front-end for simulator and estimator runs.
+#
+# JobManager.run(qc) / .run_all(circuits) / .estimate(circuit, observable)
+# are coroutines. Many can be awaited concurrently; the blocking
+# AerSimulator / Estimator call runs on a worker thread, and admission is
+# limited so that at most max_jobs run at once and their estimated memory
+# (parallel_sweep.method_memory_bytes) stays inside the budget. A job
+# gets the cores divided by the jobs running when it starts, so a job that
+# runs alone uses the whole machine. run_all keeps kg1.run_sweep's batching
+# for cheap circuits: those still to run are submitted as one Aer job per
+# method, in batches of at most BATCH_BYTES estimated memory, while every
+# circuit above that runs as its own job. Each job is stored as soon as it
+# finishes, so an interrupted sweep loses at most the jobs in flight.
+#
+# Every completed result is written to a ResultStore (SQLite, one row per
+# experiment) keyed by a SHA-256 of the circuit's structural hash
+# (transpile_cache's circuit_key, so rebuilt circuits hit), its metadata and
+# every run option. Resubmitting a stored experiment returns the stored
+# result without running it, so an interrupted sweep picks up where it
+# stopped. Store reads and writes run on a single store thread, never on
+# the event loop. Estimates are only stored for exact estimators: a
+# sampling estimator's value depends on its RNG state, not just its inputs.
+
+STORE_PATH = os.environ.get(
+    'RESULT_STORE', os.path.join(os.path.expanduser('~'), '.cache', 'quantum-computing', 'results.sqlite')
+)
+
+# Default number of jobs in flight
+MAX_JOBS = 2
+# Estimated memory up to which circuits share a batched Aer job
+# (statevector up to 21 qubits); larger circuits each get their own job
+BATCH_BYTES = 64 * 1024 ** 2
+
+STATS = {'run': 0, 'stored': 0}
+
+# Store key for any JSON-able description of a piece of work
+def record_key(kind, **inputs):
+    return hashlib.sha256(json.dumps(dict(inputs, kind=kind), sort_keys=True, default=str).encode()).hexdigest()
+
+def job_key(qc, **options):
+    return record_key('run', circuit=circuit_key(qc), metadata=qc.metadata or {}, options=options)
+
+# Settings that change what an estimator returns: V1 run options plus the
+# shots / precision / seed attributes of V2 and sampling estimators
+def estimator_options(estimator):
+    options = getattr(estimator, 'options', None)
+    options = dict(vars(options)) if options is not None else {}
+    for name in ('shots', 'precision', 'default_shots', 'default_precision', 'seed'):
+        if hasattr(estimator, name):
+            options[name] = getattr(estimator, name)
+    return options
+
+def is_exact(estimator):
+    options = estimator_options(estimator)
+    return not any(options.get(name) for name in ('shots', 'precision', 'default_shots', 'default_precision'))
+
+def estimate_key(circuit, observable, parameter_values, estimator):
+    terms = sorted((label, complex(c).real, complex(c).imag) for label, c in observable.to_list())
+    return record_key(
+        'estimate',
+        circuit=circuit_key(circuit),
+        observable=terms,
+        parameter_values=None if parameter_values is None else [float(v) for v in parameter_values],
+        estimator=f"{type(estimator).__module__}.{type(estimator).__qualname__}",
+        options=estimator_options(estimator),
+    )
+
+def _pack_counts(counts):
+    buffer = io.BytesIO()
+    np.savez(buffer, outcomes=counts.outcomes, counts=counts.counts)
+    return buffer.getvalue(), {'num_bits': counts.num_bits, 'creg_sizes': counts.creg_sizes}
+
+def _unpack_counts(payload, meta):
+    data = np.load(io.BytesIO(payload))
+    return Counts(data['outcomes'], data['counts'], meta['num_bits'], meta['creg_sizes'])
+
+
+class ResultStore:
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # used from JobManager's store thread as well as the creating thread
+        self._db = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS results ('
+                         'key TEXT PRIMARY KEY, kind TEXT, created REAL, seconds REAL, '
+                         'metadata TEXT, payload BLOB)')
+        self._db.commit()
+
+    def get(self, key):
+        row = self._db.execute('SELECT kind, seconds, metadata, payload FROM results WHERE key = ?',
+                               (key,)).fetchone()
+        if row is None:
+            return None
+        kind, seconds, metadata, payload = row
+        return {'kind': kind, 'seconds': seconds, 'metadata': json.loads(metadata), 'payload': payload}
+
+    def put(self, key, kind, seconds, metadata, payload=None):
+        self.put_many([(key, kind, seconds, metadata, payload)])
+
+    # Several (key, kind, seconds, metadata, payload) rows in one transaction
+    def put_many(self, rows):
+        now = time.time()
+        self._db.executemany('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)',
+                             [(key, kind, now, seconds, json.dumps(metadata, default=str), payload)
+                              for key, kind, seconds, metadata, payload in rows])
+        self._db.commit()
+
+    def __contains__(self, key):
+        return self._db.execute('SELECT 1 FROM results WHERE key = ?', (key,)).fetchone() is not None
+
+    def __len__(self):
+        return self._db.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def close(self):
+        self._db.close()
+
+
+class JobManager:
+    def __init__(self, simulator=None, store=None, max_jobs=MAX_JOBS, memory_budget_mb=MEMORY_BUDGET_MB):
+        self.max_jobs = max_jobs or MAX_JOBS
+        self.memory_budget = memory_budget_mb * 1024 ** 2
+        self.store = store
+        self._simulator = simulator
+        self._executor = ThreadPoolExecutor(max_workers=self.max_jobs)
+        self._store_executor = ThreadPoolExecutor(max_workers=1)
+        self._loop = None
+        self._condition = None
+        self._running = 0
+        self._used = 0
+
+    @property
+    def simulator(self):
+        if self._simulator is None:
+            from qiskit_aer import AerSimulator
+            self._simulator = AerSimulator(max_memory_mb=self.memory_budget // 1024 ** 2)
+        return self._simulator
+
+    # Wait until a job slot and `memory` bytes of the budget are free; yields
+    # the Aer thread count for the job. The Condition belongs to the running
+    # event loop, so each asyncio.run() gets a fresh one.
+    @contextlib.asynccontextmanager
+    async def _reserve(self, memory):
+        if memory > self.memory_budget:
+            raise MemoryError(f"job needs ~{memory / 1024 ** 2:.0f} MB, "
+                              f"budget is {self.memory_budget / 1024 ** 2:.0f} MB")
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._condition = loop, asyncio.Condition()
+            self._running = self._used = 0
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: self._running < self.max_jobs and self._used + memory <= self.memory_budget)
+            self._running += 1
+            self._used += memory
+            threads = max((os.cpu_count() or 1) // self._running, 1)
+        try:
+            yield threads
+        finally:
+            async with self._condition:
+                self._running -= 1
+                self._used -= memory
+                self._condition.notify_all()
+
+    async def _in_thread(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def _store_call(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._store_executor, fn, *args)
+
+    def _run_sync(self, circuits, shots, method, options, threads):
+        result = self.simulator.run(circuits, shots=shots, method=method, max_parallel_experiments=0,
+                                    max_parallel_threads=threads, **options).result()
+        return [(Counts.from_result(result, i), exp.time_taken, exp.metadata)
+                for i, exp in enumerate(result.results)]
+
+    # Cheap jobs (smallest first) share batches of at most BATCH_BYTES; every
+    # more expensive job is a batch of its own
+    def _batches(self, jobs, method):
+        batches, batch, used = [], [], 0
+        for job in sorted(jobs, key=lambda job: job[1].num_qubits):
+            memory = method_memory_bytes(job[1].num_qubits, method)
+            if batch and used + memory > BATCH_BYTES:
+                batches.append((batch, used))
+                batch, used = [], 0
+            batch.append(job)
+            used += memory
+        if batch:
+            batches.append((batch, used))
+        return batches
+
+    async def _run_batch(self, batch, memory, shots, method, options, results):
+        from kg1 import _experiment_info
+        async with self._reserve(memory) as threads:
+            outputs = await self._in_thread(self._run_sync, [qc for _, qc, _ in batch],
+                                            shots, method, options, threads)
+        rows = []
+        for (name, _, key), (counts, seconds, metadata) in zip(batch, outputs):
+            STATS['run'] += 1
+            info = _experiment_info(method, metadata)
+            results[name] = {'counts': counts, 'seconds': seconds, 'method': method,
+                             'info': info, 'stored': False}
+            if self.store is not None:
+                payload, meta = _pack_counts(counts)
+                rows.append((key, 'run', seconds, dict(meta, method=method, info=info, shots=shots),
+                             payload))
+        if rows:
+            await self._store_call(self.store.put_many, rows)
+
+    # {name: circuit} -> {name: result}, where a result is {'counts',
+    # 'seconds' (Aer's time_taken), 'method', 'info', 'stored'}. The method
+    # defaults to kg1.choose_method per circuit and MPS circuits get kg1's
+    # run options and info; stored experiments are read back, the rest run
+    # batched per method and run options (see _batches).
+    async def run_all(self, circuits, shots=1024, method=None, **options):
+        from kg1 import _run_options, choose_method, get_mps_config
+        results = {}
+        groups = {}
+        for name, qc in circuits.items():
+            qc_method = method or choose_method(qc)
+            qc_options = dict(_run_options(qc_method, get_mps_config(qc)), **options)
+            key = job_key(qc, shots=shots, method=qc_method, **qc_options)
+            if self.store is not None:
+                row = await self._store_call(self.store.get, key)
+                if row is not None:
+                    STATS['stored'] += 1
+                    meta = row['metadata']
+                    results[name] = {'counts': _unpack_counts(row['payload'], meta), 'seconds': row['seconds'],
+                                     'method': meta['method'], 'info': meta['info'], 'stored': True}
+                    continue
+            group = (qc_method, json.dumps(qc_options, sort_keys=True, default=str))
+            groups.setdefault(group, (qc_method, qc_options, []))[2].append((name, qc, key))
+        await asyncio.gather(*(self._run_batch(batch, memory, shots, qc_method, qc_options, results)
+                               for qc_method, qc_options, jobs in groups.values()
+                               for batch, memory in self._batches(jobs, qc_method)))
+        return {name: results[name] for name in circuits}
+
+    # Simulate one circuit; same result dict as run_all
+    async def run(self, qc, shots=1024, method=None, **options):
+        return (await self.run_all({0: qc}, shots, method, **options))[0]
+
+    # <observable> on `circuit` with an Estimator (V1 or V2; a
+    # StatevectorEstimator / Estimator by default). Returns {'value',
+    # 'seconds', 'stored'}; only exact estimators use the store.
+    async def estimate(self, circuit, observable, parameter_values=None, estimator=None):
+        estimator = estimator or _default_estimator()
+        store = self.store if is_exact(estimator) else None
+        key = estimate_key(circuit, observable, parameter_values, estimator)
+        if store is not None:
+            row = await self._store_call(store.get, key)
+            if row is not None:
+                STATS['stored'] += 1
+                return {'value': row['metadata']['value'], 'seconds': row['seconds'], 'stored': True}
+
+        async with self._reserve(method_memory_bytes(circuit.num_qubits, 'statevector')):
+            start = time.perf_counter()
+            value = await self._in_thread(_estimate_sync, estimator, circuit, observable, parameter_values)
+            seconds = time.perf_counter() - start
+        STATS['run'] += 1
+        if store is not None:
+            await self._store_call(store.put, key, 'estimate', seconds, {'value': value})
+        return {'value': value, 'seconds': seconds, 'stored': False}
+
+    def close(self):
+        self._executor.shutdown()
+        self._store_executor.shutdown()
+
+def _default_estimator():
+    try:
+        from qiskit.primitives import StatevectorEstimator
+        return StatevectorEstimator()
+    except ImportError:
+        from qiskit.primitives import Estimator
+        return Estimator()
+
+def _estimate_sync(estimator, circuit, observable, parameter_values):
+    try:
+        from qiskit.primitives import BaseEstimatorV2
+    except ImportError:
+        BaseEstimatorV2 = ()
+    if isinstance(estimator, BaseEstimatorV2):
+        pub = (circuit, observable) if parameter_values is None else (circuit, observable, parameter_values)
+        return float(estimator.run([pub]).result()[0].data.evs)
+    values = None if parameter_values is None else [parameter_values]
+    return float(estimator.run([circuit], [observable], values).result().values[0])
+
+# kg1.run_sweep through a JobManager: the same {(kind, n): (counts, elapsed,
+# method, info)} result, but finished experiments are read back from
+# `store` instead of being run again
+def resumable_sweep(qubit_list, store=None, shots=1024, mps_config=None, max_jobs=MAX_JOBS,
+                    memory_budget_mb=MEMORY_BUDGET_MB):
+    from kg1 import create_clifford_circuit, create_non_clifford_circuit
+    circuits = {}
+    for n in qubit_list:
+        circuits[('clifford', n)] = create_clifford_circuit(n, mps_config)
+        circuits[('non_clifford', n)] = create_non_clifford_circuit(n, mps_config)
+
+    async def sweep():
+        manager = JobManager(store=store, max_jobs=max_jobs, memory_budget_mb=memory_budget_mb)
+        try:
+            return await manager.run_all(circuits, shots)
+        finally:
+            manager.close()
+
+    results = asyncio.run(sweep())
+    return {key: (r['counts'], r['seconds'], r['method'], r['info']) for key, r in results.items()}
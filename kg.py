@@ -1,15 +1,17 @@
 from qiskit import QuantumCircuit
 from qiskit_aer import AerSimulator       # ← AerSimulator comes from qiskit_aer, not qiskit.providers
-import matplotlib.pyplot as plt
 import time
 
+import render
+from counts import Counts, plot_histogram
+
 # Function to simulate and measure time complexity
 def simulate_circuit(qc, simulator):
-    start_time = time.time()
+    start_time = time.perf_counter()
     job = simulator.run(qc, shots=1024)   # ← use .run(...) instead of execute(...)
     result = job.result()
-    counts = result.get_counts()
-    elapsed = time.time() - start_time
+    counts = Counts.from_result(result)
+    elapsed = time.perf_counter() - start_time
     print(f"Time taken to simulate the circuit: {elapsed:.6f} seconds")
     return counts, elapsed
 
@@ -34,47 +36,20 @@ def create_non_clifford_circuit(num_qubits):
     qc.measure_all()
     return qc
 
-# Main: compare Clifford vs Non-Clifford
-def main(num_qubits):
-    qc_c = create_clifford_circuit(num_qubits)
-    qc_nc = create_non_clifford_circuit(num_qubits)
-
-    print("Clifford Circuit:\n", qc_c)
-    print("\nNon-Clifford Circuit:\n", qc_nc)
-
-    # Instantiate the Aer simulator with the 'qasm' method:
-    sim = AerSimulator()      
-
-    counts_c, t_c = simulate_circuit(qc_c, sim)
-    counts_nc, t_nc = simulate_circuit(qc_nc, sim)
-
-    print("\nClifford counts:", counts_c)
-    print("Non-Clifford counts:", counts_nc)
-
-    # Plot circuits and results
-    fig, axs = plt.subplots(2, 2, figsize=(12, 10))
+# Summary figure: circuits, histograms and timings (rendered by render.py)
+def draw_summary(fig, qc_c, qc_nc, counts_c, counts_nc, t_c, t_nc):
+    num_qubits = qc_c.num_qubits
+    axs = fig.subplots(2, 2)
 
     # Circuit diagrams
-    axs[0, 0].axis('off')
-    qc_c.draw('mpl', ax=axs[0, 0])
+    render.draw_circuit(axs[0, 0], qc_c)
     axs[0, 0].set_title(f"Clifford ({num_qubits} qubits)")
 
-    axs[0, 1].axis('off')
-    qc_nc.draw('mpl', ax=axs[0, 1])
+    render.draw_circuit(axs[0, 1], qc_nc)
     axs[0, 1].set_title(f"Non-Clifford ({num_qubits} qubits)")
 
-    # Histograms
-    labels_c, vals_c = zip(*counts_c.items())
-    labels_nc, vals_nc = zip(*counts_nc.items())
-    x = range(len(labels_c))
-    w = 0.35
-
-    axs[1, 0].bar(x, vals_c, w, label='Clifford')
-    axs[1, 0].bar([i + w for i in x], vals_nc, w, label='Non-Clifford')
-    axs[1, 0].set_xticks([i + w/2 for i in x])
-    axs[1, 0].set_xticklabels(labels_c)
-    axs[1, 0].set_xlabel('Outcome')
-    axs[1, 0].set_ylabel('Counts')
+    # Histograms of the most frequent outcomes
+    plot_histogram(axs[1, 0], {'Clifford': counts_c, 'Non-Clifford': counts_nc})
     axs[1, 0].set_title('Measurement Results')
     axs[1, 0].legend()
 
@@ -86,9 +61,29 @@ def main(num_qubits):
         ha='center', va='center', fontsize=12,
         bbox=dict(facecolor='white', alpha=0.8)
     )
+    fig.tight_layout()
 
-    plt.tight_layout()
-    plt.show()
+# Main: compare Clifford vs Non-Clifford
+def main(num_qubits):
+    qc_c = create_clifford_circuit(num_qubits)
+    qc_nc = create_non_clifford_circuit(num_qubits)
+
+    print("Clifford Circuit:\n", qc_c)
+    print("\nNon-Clifford Circuit:\n", qc_nc)
+
+    # Instantiate the Aer simulator with the 'qasm' method:
+    sim = AerSimulator()      
+
+    counts_c, t_c = simulate_circuit(qc_c, sim)
+    counts_nc, t_nc = simulate_circuit(qc_nc, sim)
+
+    print("\nClifford counts:", counts_c)
+    print("Non-Clifford counts:", counts_nc)
+
+    # Plot circuits and results
+    render.figure('kg_summary', draw_summary, qc_c, qc_nc, counts_c, counts_nc, t_c, t_nc,
+                  figsize=(12, 10))
 
 if __name__ == "__main__":
     main(num_qubits=6)
+    render.finish()
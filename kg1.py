@@ -1,29 +1,127 @@
 from qiskit import QuantumCircuit
-from qiskit_aer import AerSimulator
-import matplotlib.pyplot as plt
+import os
+import re
 import time
+import render
+import scaling_fit
+import tableau_sim
+from counts import Counts, plot_histogram
 
-# Function to simulate and measure time complexity
-def simulate_circuit(qc, simulator, shots=1024):
-    start_time = time.time()
-    job = simulator.run(qc, shots=shots)
+# Circuit diagrams beyond this width are unreadable in the summary figure
+MAX_DRAW_QUBITS = 30
+
+# Gates that keep a circuit inside the Clifford group (stabilizer-simulable)
+CLIFFORD_GATES = {'id', 'x', 'y', 'z', 'h', 's', 'sdg', 'sx', 'sxdg',
+                  'cx', 'cy', 'cz', 'swap', 'measure', 'barrier', 'reset'}
+T_GATES = {'t', 'tdg'}
+
+# Largest register we still hand to the dense 2^n statevector method
+MAX_STATEVECTOR_QUBITS = 30
+# Clifford+T circuits up to this many T gates go to a low-entanglement method
+# once they no longer fit in a statevector
+MAX_LOW_T_COUNT = 8
+
+# matrix_product_state settings: bond-dimension cap (None = unbounded) and the
+# Schmidt-value truncation threshold (Aer's default)
+MPS_CONFIG = {'max_bond_dimension': None, 'truncation_threshold': 1e-16}
+
+def is_clifford(qc):
+    return all(inst.operation.name in CLIFFORD_GATES for inst in qc.data)
+
+def t_count(qc):
+    ops = qc.count_ops()
+    return sum(ops.get(name, 0) for name in T_GATES)
+
+# Pick the cheapest Aer method that is still exact for this circuit.
+# Clifford circuits go to the stabilizer tableau (polynomial in n); everything
+# else goes to statevector while 2^n amplitudes fit, and Clifford+T circuits
+# with few T gates fall back to matrix_product_state above that. Aer's
+# extended_stabilizer is not used: its Metropolis sampler does not mix on the
+# GHZ-style outputs of these circuits. Circuits built with an mps_config are
+# always sent to matrix_product_state unless they are Clifford.
+def choose_method(qc):
+    if is_clifford(qc):
+        return 'stabilizer'
+    if get_mps_config(qc) is not None:
+        return 'matrix_product_state'
+    if qc.num_qubits <= MAX_STATEVECTOR_QUBITS:
+        return 'statevector'
+    clifford_t = all(inst.operation.name in CLIFFORD_GATES | T_GATES for inst in qc.data)
+    if clifford_t and t_count(qc) <= MAX_LOW_T_COUNT:
+        return 'matrix_product_state'
+    return 'statevector'
+
+def get_mps_config(qc):
+    return (qc.metadata or {}).get('mps_config')
+
+# Aer run options for a matrix_product_state job; MPS logging is switched on
+# so the bond dimensions and discarded weight can be reported
+def mps_run_options(mps_config=None):
+    config = dict(MPS_CONFIG, **(mps_config or {}))
+    options = {'mps_log_data': True,
+               'matrix_product_state_truncation_threshold': config['truncation_threshold']}
+    if config['max_bond_dimension'] is not None:
+        options['matrix_product_state_max_bond_dimension'] = config['max_bond_dimension']
+    return options
+
+# Largest bond dimension reached and total discarded Schmidt weight
+# (truncation error) from the MPS_log_data string of an Aer result
+def parse_mps_log(metadata):
+    log = metadata.get('MPS_log_data', '')
+    bonds = [int(d) for dims in re.findall(r'BD=\[([\d ]*)\]', log) for d in dims.split()]
+    discarded = [float(v) for v in re.findall(r'discarded_value=([\d.eE+-]+)', log)]
+    return {'max_bond_dimension': max(bonds, default=1), 'truncation_error': sum(discarded)}
+
+# Run options for `method`, plus the per-experiment info collected afterwards
+def _run_options(method, mps_config):
+    if method == 'matrix_product_state':
+        return mps_run_options(mps_config)
+    return {}
+
+def _experiment_info(method, metadata):
+    if method == 'matrix_product_state':
+        return parse_mps_log(metadata)
+    return {}
+
+# Simulate and also return method-specific info (max bond dimension and
+# truncation error for matrix_product_state runs)
+def simulate_circuit_info(qc, simulator, shots=1024, method=None, mps_config=None):
+    if method is None:
+        method = choose_method(qc)
+    if mps_config is None:
+        mps_config = get_mps_config(qc)
+    start_time = time.perf_counter()
+    job = simulator.run(qc, shots=shots, method=method, **_run_options(method, mps_config))
     result = job.result()
-    counts = result.get_counts()
-    elapsed = time.time() - start_time
+    counts = Counts.from_result(result)
+    elapsed = time.perf_counter() - start_time
+    return counts, elapsed, _experiment_info(method, result.results[0].metadata)
+
+# Function to simulate and measure time complexity; counts come back as a
+# counts.Counts
+def simulate_circuit(qc, simulator, shots=1024, method=None, mps_config=None):
+    counts, elapsed, _ = simulate_circuit_info(qc, simulator, shots, method, mps_config)
     return counts, elapsed
 
+# Attach an MPS configuration so choose_method/simulate_circuit route the
+# circuit to matrix_product_state with those settings
+def _with_mps_config(qc, mps_config):
+    if mps_config is not None:
+        qc.metadata = dict(qc.metadata or {}, mps_config=mps_config)
+    return qc
+
 # Build a Clifford Circuit
-def create_clifford_circuit(num_qubits):
+def create_clifford_circuit(num_qubits, mps_config=None):
     qc = QuantumCircuit(num_qubits)
     qc.h(0)
     for i in range(num_qubits - 1):
         qc.cx(i, i + 1)
     qc.s(1)
     qc.measure_all()
-    return qc
+    return _with_mps_config(qc, mps_config)
 
 # Build a Non-Clifford Circuit (adds a T-gate)
-def create_non_clifford_circuit(num_qubits):
+def create_non_clifford_circuit(num_qubits, mps_config=None):
     qc = QuantumCircuit(num_qubits)
     qc.h(0)
     for i in range(num_qubits - 1):
@@ -31,66 +129,125 @@ def create_non_clifford_circuit(num_qubits):
     qc.s(1)
     qc.t(1)
     qc.measure_all()
-    return qc
+    return _with_mps_config(qc, mps_config)
 
-# Main function to simulate and compare circuits for a list of qubits
-def main(qubit_list):
-    sim = AerSimulator(max_memory_mb=32768)  # defaults to automatic shot-based mode
+# Build the whole Clifford / Non-Clifford family up front and submit it as one
+# batched job per simulation method, letting Aer run the experiments in
+# parallel. Returns {(kind, n): (counts, elapsed, method, info)} where elapsed
+# is the per-experiment time_taken reported in the result metadata and info
+# holds the MPS bond dimension / truncation error for MPS runs.
+def run_sweep(qubit_list, simulator, shots=1024, mps_config=None):
+    circuits = {}
+    for n in qubit_list:
+        circuits[('clifford', n)] = create_clifford_circuit(n, mps_config)
+        circuits[('non_clifford', n)] = create_non_clifford_circuit(n, mps_config)
 
-    time_clifford_list = []
-    time_non_clifford_list = []
+    keys_by_method = {}
+    for key, qc in circuits.items():
+        keys_by_method.setdefault(choose_method(qc), []).append(key)
 
-    # First pass: collect timings
-    for n in qubit_list:
-        qc_c = create_clifford_circuit(n)
-        qc_nc = create_non_clifford_circuit(n)
-        _, t_c = simulate_circuit(qc_c, sim)
-        _, t_nc = simulate_circuit(qc_nc, sim)
-        time_clifford_list.append(t_c)
-        time_non_clifford_list.append(t_nc)
-        print(f"Qubits={n}: Clifford {t_c:.4f}s, Non-Clifford {t_nc:.4f}s")
+    results = {}
+    for method, keys in keys_by_method.items():
+        job = simulator.run([circuits[key] for key in keys], shots=shots, method=method,
+                            max_parallel_experiments=0, **_run_options(method, mps_config))
+        result = job.result()
+        for i, key in enumerate(keys):
+            exp = result.results[i]
+            results[key] = (Counts.from_result(result, i), exp.time_taken, method,
+                            _experiment_info(method, exp.metadata))
+    return results
 
-    # Plot time complexity
-    fig_time, ax = plt.subplots(figsize=(8,5))
+# Time complexity plot (rendered by render.py)
+def draw_timing(fig, qubit_list, time_clifford_list, time_non_clifford_list, time_tableau_list):
+    ax = fig.subplots()
     ax.plot(qubit_list, time_clifford_list, 'o-', label='Clifford')
     ax.plot(qubit_list, time_non_clifford_list, 'o-', label='Non-Clifford')
+    ax.plot(qubit_list, time_tableau_list, 's--', label='Clifford (NumPy tableau)')
     ax.set_xlabel('Number of Qubits')
     ax.set_ylabel('Simulation Time (s)')
     ax.set_title('Clifford vs Non-Clifford Time Complexity')
     ax.legend()
     ax.grid(True)
-    plt.show()
 
-    # Example: show circuits and counts for the largest size
-    n = qubit_list[-1]
-    qc_c = create_clifford_circuit(n)
-    qc_nc = create_non_clifford_circuit(n)
-    counts_c, _ = simulate_circuit(qc_c, sim)
-    counts_nc, _ = simulate_circuit(qc_nc, sim)
-
-    fig, axs = plt.subplots(2, 2, figsize=(12,10))
+# Circuits, histograms and timings for one size; circuits too wide for the
+# mpl drawer are shown as text
+def draw_summary(fig, qc_c, qc_nc, counts_c, counts_nc, t_c, t_nc):
+    n = qc_c.num_qubits
+    axs = fig.subplots(2, 2)
     # Circuit diagrams
-    axs[0,0].axis('off'); qc_c.draw('mpl', ax=axs[0,0]); axs[0,0].set_title(f'Clifford ({n} qubits)')
-    axs[0,1].axis('off'); qc_nc.draw('mpl', ax=axs[0,1]); axs[0,1].set_title(f'Non-Clifford ({n} qubits)')
-    # Histograms
-    labels_c, vals_c = zip(*counts_c.items())
-    labels_nc, vals_nc = zip(*counts_nc.items())
-    x = range(len(labels_c))
-    w = 0.35
-    axs[1,0].bar(x, vals_c, w, label='Clifford')
-    axs[1,0].bar([i+w for i in x], vals_nc, w, label='Non-Clifford')
-    axs[1,0].set_xticks([i+w/2 for i in x]); axs[1,0].set_xticklabels(labels_c)
-    axs[1,0].set_xlabel('Outcome'); axs[1,0].set_ylabel('Counts')
+    render.draw_circuit(axs[0,0], qc_c); axs[0,0].set_title(f'Clifford ({n} qubits)')
+    render.draw_circuit(axs[0,1], qc_nc); axs[0,1].set_title(f'Non-Clifford ({n} qubits)')
+    # Histograms of the most frequent outcomes
+    plot_histogram(axs[1,0], {'Clifford': counts_c, 'Non-Clifford': counts_nc})
     axs[1,0].set_title('Measurement Results'); axs[1,0].legend()
     # Timing summary
     axs[1,1].axis('off')
     axs[1,1].text(0.5, 0.5,
-        f"Clifford: {time_clifford_list[-1]:.4f}s\nNon-Clifford: {time_non_clifford_list[-1]:.4f}s",
+        f"Clifford: {t_c:.4f}s\nNon-Clifford: {t_nc:.4f}s",
         ha='center', va='center', fontsize=12, bbox=dict(facecolor='white', alpha=0.8))
-    plt.tight_layout()
-    plt.show()
+    fig.tight_layout()
+
+# Main function to simulate and compare circuits for a list of qubits
+# With a job_queue.ResultStore, the sweep runs through the async job queue
+# and experiments already in the store are read back instead of re-run, so
+# an interrupted sweep resumes where it stopped
+def main(qubit_list, mps_config=None, store=None):
+    time_clifford_list = []
+    time_non_clifford_list = []
+    time_tableau_list = []
+
+    # First pass: collect timings from one batched sweep
+    if store is not None:
+        from job_queue import resumable_sweep
+        sweep = resumable_sweep(qubit_list, store, mps_config=mps_config)
+    else:
+        from qiskit_aer import AerSimulator
+        sim = AerSimulator(max_memory_mb=32768)  # defaults to automatic shot-based mode
+        sweep = run_sweep(qubit_list, sim, mps_config=mps_config)
+    for n in qubit_list:
+        _, t_c, m_c, _ = sweep[('clifford', n)]
+        _, t_nc, m_nc, info_nc = sweep[('non_clifford', n)]
+        if info_nc:
+            m_nc += (f", bond dim {info_nc['max_bond_dimension']}, "
+                     f"truncation error {info_nc['truncation_error']:.2e}")
+        _, t_tab = tableau_sim.simulate_circuit(create_clifford_circuit(n))
+        time_clifford_list.append(t_c)
+        time_non_clifford_list.append(t_nc)
+        time_tableau_list.append(t_tab)
+        print(f"Qubits={n}: Clifford {t_c:.4f}s [{m_c}], Non-Clifford {t_nc:.4f}s [{m_nc}], "
+              f"Clifford {t_tab:.4f}s [numpy tableau]")
+
+    # Scaling laws of every method with enough points in the sweep
+    series = {method: s for method, s in scaling_fit.series_from_sweep(sweep).items()
+              if len(s['num_qubits']) >= 3}
+    scaling_fit.report(scaling_fit.fit_all(series))
+
+    # Plot time complexity
+    render.figure('kg1_timing', draw_timing, qubit_list, time_clifford_list, time_non_clifford_list,
+                  time_tableau_list, figsize=(8,5))
+
+    # Example: show circuits and counts for the largest size that still draws,
+    # reusing the counts cached from the sweep
+    n = max(q for q in qubit_list if q <= MAX_DRAW_QUBITS)
+    qc_c = create_clifford_circuit(n)
+    qc_nc = create_non_clifford_circuit(n)
+    counts_c, t_c, _, _ = sweep[('clifford', n)]
+    counts_nc, t_nc, _, _ = sweep[('non_clifford', n)]
+    render.figure('kg1_summary', draw_summary, qc_c, qc_nc, counts_c, counts_nc, t_c, t_nc,
+                  figsize=(12,10))
 
 if __name__ == "__main__":
-    # adjust range as needed (e.g. 2→30)
-    qubit_list = list(range(2, 31))
-    main(qubit_list)
+    # adjust range as needed (e.g. 2→30); the stabilizer/MPS dispatch keeps
+    # the larger sizes polynomial. KG1_MPS=1 opts into MPS_CONFIG, which runs
+    # the Non-Clifford curve on matrix_product_state at every size; by
+    # default small sizes stay on statevector, so the sweep also yields the
+    # statevector series scaling_fit needs
+    qubit_list = list(range(2, 31)) + [50, 100, 200, 500]
+    mps_config = MPS_CONFIG if os.environ.get('KG1_MPS') == '1' else None
+    # RESULT_STORE=path.sqlite keeps every finished experiment for resuming
+    store = None
+    if os.environ.get('RESULT_STORE'):
+        from job_queue import ResultStore
+        store = ResultStore(os.environ['RESULT_STORE'])
+    main(qubit_list, mps_config=mps_config, store=store)
+    render.finish()
@@ -0,0 +1,105 @@
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import os
+import time
+
+from kg1 import choose_method, create_clifford_circuit, create_non_clifford_circuit, simulate_circuit
+
+# Total RAM the sweep may use at once, same budget kg1.main gives AerSimulator
+MEMORY_BUDGET_MB = 32768
+# Rough bond dimension assumed when sizing matrix_product_state jobs
+MPS_BOND_ESTIMATE = 16
+
+# Estimate the memory a job needs before it is scheduled (bytes)
+def estimate_memory_bytes(qc, method):
+    return method_memory_bytes(qc.num_qubits, method)
+
+def method_memory_bytes(n, method):
+    if method == 'statevector':
+        return 16 * 2 ** n                          # complex128 amplitudes
+    if method == 'stabilizer':
+        return (2 * n) * (2 * n + 1) // 8 + 1       # bit tableau
+    if method == 'numpy_tableau':
+        return 2 * 2 * n * 8 * ((n + 63) // 64)     # packed uint64 X/Z rows
+    if method == 'matrix_product_state':
+        return 16 * 2 * n * MPS_BOND_ESTIMATE ** 2  # one chi x chi pair per site
+    return 16 * 2 ** n
+
+# One simulator per worker process, created on first use
+_worker_simulator = None
+
+def _run_in_worker(qc, method, shots, max_memory_mb):
+    global _worker_simulator
+    if _worker_simulator is None:
+        from qiskit_aer import AerSimulator
+        _worker_simulator = AerSimulator(max_memory_mb=max_memory_mb, max_parallel_threads=1)
+    return simulate_circuit(qc, _worker_simulator, shots=shots, method=method)
+
+# Run a {key: circuit} family. Circuits small enough to share the machine are
+# packed into a process pool (one thread each), never letting the estimated
+# memory of in-flight jobs exceed the budget; circuits that need more than one
+# worker's share run alone afterwards with all threads and the whole budget.
+# Returns ({key: (counts, elapsed)}, total wall time).
+def run_parallel_sweep(circuits, shots=1024, memory_budget_mb=MEMORY_BUDGET_MB, max_workers=None):
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    budget = memory_budget_mb * 1024 ** 2
+    worker_budget = budget // max_workers
+
+    small, large = [], []
+    for key, qc in circuits.items():
+        method = choose_method(qc)
+        mem = estimate_memory_bytes(qc, method)
+        if mem > budget:
+            raise MemoryError(f"{key}: needs ~{mem / 1024 ** 2:.0f} MB with {method}, "
+                              f"budget is {memory_budget_mb} MB")
+        (small if mem <= worker_budget else large).append((key, qc, method, mem))
+    # Largest first so the pool is packed tightly
+    small.sort(key=lambda job: job[3], reverse=True)
+
+    results = {}
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        in_flight = {}
+        used = 0
+        while small or in_flight:
+            i = 0
+            while i < len(small) and len(in_flight) < max_workers:
+                key, qc, method, mem = small[i]
+                if used + mem > budget:
+                    i += 1
+                    continue
+                future = pool.submit(_run_in_worker, qc, method, shots,
+                                     worker_budget // 1024 ** 2)
+                in_flight[future] = (key, mem)
+                used += mem
+                small.pop(i)
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                key, mem = in_flight.pop(future)
+                used -= mem
+                results[key] = future.result()
+
+    if large:
+        from qiskit_aer import AerSimulator
+        sim = AerSimulator(max_memory_mb=memory_budget_mb, max_parallel_threads=0)
+        for key, qc, method, _ in large:
+            results[key] = simulate_circuit(qc, sim, shots=shots, method=method)
+    wall_time = time.perf_counter() - start_time
+    return results, wall_time
+
+def main(qubit_list):
+    circuits = {}
+    for n in qubit_list:
+        circuits[('clifford', n)] = create_clifford_circuit(n)
+        circuits[('non_clifford', n)] = create_non_clifford_circuit(n)
+
+    results, wall_time = run_parallel_sweep(circuits)
+    for n in qubit_list:
+        _, t_c = results[('clifford', n)]
+        _, t_nc = results[('non_clifford', n)]
+        print(f"Qubits={n}: Clifford {t_c:.4f}s, Non-Clifford {t_nc:.4f}s")
+    serial_time = sum(elapsed for _, elapsed in results.values())
+    print(f"Total wall time {wall_time:.4f}s (sum of per-circuit times {serial_time:.4f}s)")
+
+if __name__ == "__main__":
+    main(list(range(2, 31)))
@@ -0,0 +1,139 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import os
+import time
+
+from qch2 import build_ansatz, build_mapper, build_problem, build_vqe, driver_settings, solve
+
+# H-H dissociation curve on top of qch2.py's pipeline. Along the scan the
+# mapper, UCCSD ansatz and VQE (with its gradient and the compiled circuit
+# that gradient caches) are built once and reused (their structure only
+# depends on the orbital / particle counts, not on the geometry); each point
+# only brings its own Hamiltonian and initial point. Every
+# VQE starts from the optimal parameters of the neighbouring point instead of
+# from zeros. Independent contiguous segments of the curve run in a process
+# pool; only the first point of each segment starts cold.
+#
+# With a result store (job_queue.ResultStore path), every finished point is
+# written to it; a rerun of an interrupted scan reads those points back,
+# warm-starting the next point from the stored optimum, and only solves the
+# missing ones. A point is keyed by everything that determines its result:
+# the driver inputs (geometry, basis, charge, spin, unit), the mapper, the
+# compiled ansatz, the optimizer and gradient settings, the estimator and
+# whether it was warm-started.
+
+# Shortest segment the default split makes, so warm starts still carry
+# along most of the curve; at most MAX_SEGMENTS segments by default
+MIN_SEGMENT_POINTS = 6
+MAX_SEGMENTS = 4
+
+def _point_key(distance, mapper, ansatz, vqe_solver, warm_start):
+    from job_queue import estimator_options, record_key
+    from pyscf_cache import cache_key
+    from transpile_cache import circuit_key
+    return record_key(
+        'pes_point',
+        driver=cache_key(**driver_settings(distance)),
+        mapper=[type(mapper).__name__, getattr(mapper, 'num_particles', None)],
+        ansatz=record_key('circuit', circuit=circuit_key(ansatz)),
+        optimizer=[type(vqe_solver.optimizer).__name__, vqe_solver.optimizer.settings],
+        gradient=type(vqe_solver.gradient).__name__,
+        estimator=[type(vqe_solver.estimator).__name__, estimator_options(vqe_solver.estimator)],
+        warm_start=warm_start,
+    )
+
+# Scan one contiguous list of bond lengths with warm starts
+def scan_segment(distances, warm_start=True, store_path=None):
+    store = None
+    if store_path:
+        from job_queue import ResultStore
+        store = ResultStore(store_path)
+    mapper = build_mapper()
+    ansatz = vqe_solver = None
+    point = None
+    rows = []
+    for distance in distances:
+        start_time = time.perf_counter()
+        problem = build_problem(distance)
+        if vqe_solver is None:
+            ansatz = build_ansatz(problem, mapper)
+            vqe_solver = build_vqe(ansatz)
+        if point is not None:
+            vqe_solver.initial_point = point
+        if store is not None:
+            key = _point_key(distance, mapper, ansatz, vqe_solver, warm_start)
+            stored = store.get(key)
+            if stored is not None:
+                meta = stored['metadata']
+                if warm_start:
+                    point = meta['optimal_point']
+                rows.append((distance, meta['energy'], meta['iterations'],
+                             np.asarray(meta['optimal_point']), stored['seconds']))
+                continue
+        result = solve(problem, mapper, vqe_solver)
+        raw = result.raw_result
+        if warm_start:
+            point = list(raw.optimal_point)
+        rows.append((distance, result.total_energies[0], raw.cost_function_evals,
+                     np.asarray(raw.optimal_point), time.perf_counter() - start_time))
+        if store is not None:
+            store.put(key, 'pes_point', rows[-1][4],
+                      {'energy': float(rows[-1][1].real), 'iterations': int(rows[-1][2]),
+                       'optimal_point': [float(x) for x in rows[-1][3]]})
+    if store is not None:
+        store.close()
+    return rows
+
+def _split(distances, segments):
+    return [list(chunk) for chunk in np.array_split(np.asarray(distances, dtype=float), segments)
+            if len(chunk)]
+
+# Returns a dict of arrays ordered like `distances`: distance, energy (total,
+# Ha), iterations (cost function evaluations), optimal_point (one row per
+# point) and seconds per point. By default the curve is split into a few
+# contiguous segments of at least MIN_SEGMENT_POINTS points; max_workers
+# sets how many of them run at once.
+def scan(distances, segments=None, warm_start=True, max_workers=None, store_path=None):
+    if segments is None:
+        segments = max(min(MAX_SEGMENTS, len(distances) // MIN_SEGMENT_POINTS, os.cpu_count() or 1), 1)
+    chunks = _split(distances, segments)
+    if len(chunks) == 1:
+        rows = scan_segment(chunks[0], warm_start, store_path)
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers or len(chunks), len(chunks))) as pool:
+            rows = [row for part in pool.map(scan_segment, chunks, [warm_start] * len(chunks),
+                                             [store_path] * len(chunks))
+                    for row in part]
+    return {
+        'distance': np.array([r[0] for r in rows]),
+        'energy': np.array([r[1] for r in rows]),
+        'iterations': np.array([r[2] for r in rows]),
+        'optimal_point': np.array([r[3] for r in rows]),
+        'seconds': np.array([r[4] for r in rows]),
+    }
+
+def draw_pes(fig, distance, energy):
+    ax = fig.subplots()
+    ax.plot(distance, energy, 'o-')
+    ax.set_xlabel("H–H distance (Å)")
+    ax.set_ylabel("Energy (Ha)")
+    ax.set_title("H₂ potential energy surface (VQE)")
+    ax.grid(True)
+    fig.tight_layout()
+
+if __name__ == "__main__":
+    import render
+
+    distances = np.round(np.linspace(0.3, 2.5, 23), 4)
+    # RESULT_STORE=path.sqlite makes an interrupted scan resumable
+    store_path = os.environ.get('RESULT_STORE')
+    pes = scan(distances, store_path=store_path)
+    cold = scan(distances, warm_start=False, store_path=store_path)
+
+    print(f"{'R (Å)':>8} {'E (Ha)':>12} {'iters':>6} {'cold iters':>10}")
+    for d, e, it, it_cold in zip(pes['distance'], pes['energy'], pes['iterations'], cold['iterations']):
+        print(f"{d:8.3f} {e:12.6f} {it:6d} {it_cold:10d}")
+    print(f"Total iterations: warm {pes['iterations'].sum()}, cold {cold['iterations'].sum()}")
+
+    render.figure('pes_scan', draw_pes, pes['distance'], pes['energy'])
+    render.finish()
@@ -0,0 +1,190 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+# Per-stage wall-time accounting for the chemistry pipeline.
+#
+# stage(name) is a cheap perf_counter timer; stages nest, and every
+# distinct path of nested names ('solve;optimizer;objective;estimator')
+# accumulates its call count, seconds and circuits evaluated in STAGES.
+# The stack of open stages is per thread and per asyncio task, so stages
+# running concurrently (render executor, job queue) keep separate paths.
+# instrument_*() patch an estimator, optimizer or mapper instance so every
+# call runs inside a stage:
+#   estimator  - each _call (the actual evaluation), counting circuits;
+#   optimizer  - minimize, with the objective and gradient callbacks as
+#                child stages, so the optimizer's own overhead is the
+#                'optimizer' self time;
+#   mapper     - each map() call.
+# Optional capture on top (start/finish or session): a cProfile dump of the
+# whole run and tracemalloc peak / top allocation sites, plus net bytes
+# allocated per stage while tracing.
+#
+# finish(directory) writes stages.json (machine-readable breakdown with
+# self times) and stages.folded (one 'a;b;c microseconds' line per path, the
+# folded-stack input of flamegraph.pl, speedscope and inferno).
+
+PROFILE_DIR = os.environ.get('PROFILE_DIR')
+CPROFILE = os.environ.get('PROFILE_CPROFILE', '') == '1'
+TRACEMALLOC = os.environ.get('PROFILE_TRACEMALLOC', '') == '1'
+# Allocation sites kept in the tracemalloc summary
+TOP_ALLOCATIONS = 20
+
+STAGES = {}
+MEMORY = {}
+
+_stack = ContextVar('profiling_stack', default=())
+_lock = threading.Lock()
+_profiler = None
+
+def reset():
+    STAGES.clear()
+    MEMORY.clear()
+
+@contextmanager
+def stage(name, circuits=0):
+    names = _stack.get() + (name,)
+    token = _stack.set(names)
+    path = ';'.join(names)
+    tracing = tracemalloc.is_tracing()
+    allocated = tracemalloc.get_traced_memory()[0] if tracing else 0
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        allocated = tracemalloc.get_traced_memory()[0] - allocated if tracing else 0
+        with _lock:
+            entry = STAGES.get(path)
+            if entry is None:
+                entry = STAGES[path] = {'calls': 0, 'seconds': 0.0, 'circuits': 0, 'bytes': 0}
+            entry['calls'] += 1
+            entry['seconds'] += elapsed
+            entry['circuits'] += circuits
+            entry['bytes'] += allocated
+        _stack.reset(token)
+
+def timed(name):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# Replace obj.method by a version running inside stage(name); `circuits`
+# maps the call arguments to the number of circuits evaluated
+def instrument(obj, method, name, circuits=None):
+    original = getattr(obj, method)
+    if getattr(original, '_profiled', False):
+        return obj
+
+    @functools.wraps(original)
+    def wrapper(*args, **kwargs):
+        with stage(name, circuits(*args, **kwargs) if circuits else 0):
+            return original(*args, **kwargs)
+    wrapper._profiled = True
+    setattr(obj, method, wrapper)
+    return obj
+
+def instrument_estimator(estimator, name='estimator'):
+    return instrument(estimator, '_call', name, lambda circuits, *args, **kwargs: len(circuits))
+
+def instrument_optimizer(optimizer, name='optimizer'):
+    original = optimizer.minimize
+    if getattr(original, '_profiled', False):
+        return optimizer
+
+    def minimize(fun, x0, jac=None, bounds=None):
+        fun = timed('objective')(fun)
+        if jac is not None:
+            jac = timed('gradient')(jac)
+        with stage(name):
+            return original(fun, x0, jac=jac, bounds=bounds)
+    minimize._profiled = True
+    optimizer.minimize = minimize
+    return optimizer
+
+def instrument_mapper(mapper, name='mapping'):
+    return instrument(mapper, 'map', name)
+
+# Opt-in cProfile / tracemalloc capture until finish()
+def start(cprofile=CPROFILE, trace_memory=TRACEMALLOC):
+    global _profiler
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if cprofile:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+# {path: stats} with self_seconds (time not spent in a child stage) added
+def report():
+    stages = {}
+    for path, entry in STAGES.items():
+        depth = path.count(';') + 1
+        children = sum(child['seconds'] for child_path, child in STAGES.items()
+                       if child_path.startswith(path + ';') and child_path.count(';') == depth)
+        stages[path] = dict(entry, self_seconds=max(entry['seconds'] - children, 0.0))
+    return {
+        'stages': stages,
+        'total_seconds': sum(e['seconds'] for p, e in STAGES.items() if ';' not in p),
+        'memory': dict(MEMORY),
+    }
+
+def print_report(data=None):
+    data = data or report()
+    print(f"{'stage':<44} {'calls':>6} {'circuits':>9} {'total s':>9} {'self s':>9}")
+    for path in sorted(data['stages']):
+        entry = data['stages'][path]
+        name = '  ' * path.count(';') + path.rsplit(';', 1)[-1]
+        print(f"{name:<44} {entry['calls']:>6} {entry['circuits']:>9} "
+              f"{entry['seconds']:>9.3f} {entry['self_seconds']:>9.3f}")
+    print(f"total {data['total_seconds']:.3f}s")
+    if data['memory']:
+        print(f"peak traced memory {data['memory']['peak_bytes'] / 1024 ** 2:.1f} MB")
+
+def save_folded(path, data=None):
+    data = data or report()
+    with open(path, 'w') as f:
+        for stage_path, entry in sorted(data['stages'].items()):
+            micros = int(round(entry['self_seconds'] * 1e6))
+            if micros:
+                f.write(f"{stage_path} {micros}\n")
+
+# Stop any capture and, if a directory is given, write stages.json,
+# stages.folded and (with cProfile) profile.prof into it. Returns the report.
+def finish(directory=PROFILE_DIR):
+    global _profiler
+    if _profiler is not None:
+        _profiler.disable()
+    if tracemalloc.is_tracing():
+        snapshot = tracemalloc.take_snapshot()
+        MEMORY['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        MEMORY['top'] = [{'site': str(stat.traceback[0]), 'bytes': stat.size, 'count': stat.count}
+                         for stat in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]]
+        tracemalloc.stop()
+    data = report()
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, 'stages.json'), 'w') as f:
+            json.dump(data, f, indent=2)
+        save_folded(os.path.join(directory, 'stages.folded'), data)
+        if _profiler is not None:
+            _profiler.dump_stats(os.path.join(directory, 'profile.prof'))
+    _profiler = None
+    return data
+
+@contextmanager
+def session(directory=PROFILE_DIR, cprofile=CPROFILE, trace_memory=TRACEMALLOC):
+    start(cprofile, trace_memory)
+    try:
+        yield
+    finally:
+        finish(directory)
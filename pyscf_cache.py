@@ -0,0 +1,223 @@
+from qiskit_nature.units import DistanceUnit
+import numpy as np
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+from profiling import stage
+
+# Content-addressed on-disk cache for PySCFDriver(...).run(). The SCF and the
+# integral transformation are deterministic for a given (geometry, basis,
+# charge, spin, unit), so the resulting ElectronicStructureProblem is stored
+# once as plain .npy arrays (opened memory-mapped on load) plus a JSON
+# manifest, and later runs or parallel workers rebuild it without PySCF.
+#
+# Each entry is a directory named by the SHA-256 of the normalized inputs.
+# The key depends on the inputs alone, so a hit never imports PySCF; the
+# qiskit-nature / PySCF versions that produced an entry are recorded in its
+# manifest and only compared when an entry is (re)written.
+# Hits refresh the entry's mtime and the cache is trimmed least recently used
+# first once it grows beyond MAX_CACHE_BYTES.
+
+CACHE_DIR = os.environ.get(
+    'PYSCF_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'quantum-computing', 'pyscf')
+)
+MAX_CACHE_BYTES = 2 * 1024 ** 3
+# Bump when the on-disk layout changes so stale entries are never read
+FORMAT_VERSION = 1
+
+def _normalize_atom(atom):
+    lines = []
+    for line in atom.replace('\n', ';').split(';'):
+        parts = line.replace(',', ' ').split()
+        if parts:
+            lines.append(' '.join([parts[0].capitalize()] + [repr(float(v)) for v in parts[1:]]))
+    return '; '.join(lines)
+
+def cache_key(atom, basis='sto3g', charge=0, spin=0, unit=DistanceUnit.ANGSTROM):
+    inputs = {
+        'atom': _normalize_atom(atom),
+        'basis': basis.lower().replace('-', '').replace('_', ''),
+        'charge': int(charge),
+        'spin': int(spin),
+        'unit': DistanceUnit(unit).value,
+        'format': FORMAT_VERSION,
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+def _versions():
+    import qiskit_nature
+    import pyscf
+    return {'qiskit_nature': qiskit_nature.__version__, 'pyscf': pyscf.__version__}
+
+def _entry_versions(path):
+    try:
+        with open(os.path.join(path, 'manifest.json')) as f:
+            return json.load(f).get('versions')
+    except (OSError, ValueError):
+        return None
+
+def _save_integrals(integrals, name, directory, manifest):
+    for section in ('alpha', 'beta', 'beta_alpha'):
+        tensor = getattr(integrals, section)
+        if tensor is None or tensor.is_empty():
+            continue
+        for key, value in tensor.items():
+            filename = f"{len(manifest['arrays'])}.npy"
+            np.save(os.path.join(directory, filename), np.asarray(value.array))
+            manifest['arrays'].append({'owner': name, 'section': section, 'key': key,
+                                       'type': type(value).__name__, 'file': filename})
+
+def _load_integrals(name, directory, manifest):
+    from qiskit_nature.second_q.operators import ElectronicIntegrals, PolynomialTensor, Tensor
+    from qiskit_nature.second_q.operators import symmetric_two_body
+
+    sections = {}
+    for entry in manifest['arrays']:
+        if entry['owner'] != name:
+            continue
+        array = np.load(os.path.join(directory, entry['file']), mmap_mode='r')
+        if entry['type'] == 'Tensor':
+            value = Tensor(array)
+        else:
+            value = getattr(symmetric_two_body, entry['type'])(array, validate=False)
+        sections.setdefault(entry['section'], {})[entry['key']] = value
+    tensors = {section: PolynomialTensor(data, validate=False) for section, data in sections.items()}
+    return ElectronicIntegrals(**tensors, validate=False)
+
+def _save_problem(problem, directory):
+    props = problem.properties
+    dipole = props.electronic_dipole_moment
+    molecule = problem.molecule
+    manifest = {
+        'arrays': [],
+        'constants': {k: float(v) for k, v in problem.hamiltonian.constants.items()},
+        'num_particles': list(problem.num_particles),
+        'num_spatial_orbitals': problem.num_spatial_orbitals,
+        'reference_energy': problem.reference_energy,
+        'basis': problem.basis.value,
+        'molecule': {
+            'symbols': list(molecule.symbols),
+            'coords': [list(map(float, c)) for c in molecule.coords],
+            'multiplicity': molecule.multiplicity,
+            'charge': molecule.charge,
+            'units': molecule.units.value,
+            'masses': [float(m) for m in molecule.masses] if molecule.masses is not None else None,
+        },
+        'dipole': None,
+        'versions': _versions(),
+    }
+    _save_integrals(problem.hamiltonian.electronic_integrals, 'hamiltonian', directory, manifest)
+    for name in ('orbital_energies', 'orbital_energies_b'):
+        value = getattr(problem, name)
+        if value is not None:
+            np.save(os.path.join(directory, f"{name}.npy"), np.asarray(value))
+    if props.angular_momentum is not None and props.angular_momentum.overlap is not None:
+        np.save(os.path.join(directory, 'overlap.npy'), props.angular_momentum.overlap)
+    if dipole is not None:
+        manifest['dipole'] = {
+            'reverse_dipole_sign': dipole.reverse_dipole_sign,
+            'constants': {k: [float(x) for x in v] for k, v in dipole.constants.items()},
+        }
+        for axis in ('x', 'y', 'z'):
+            _save_integrals(getattr(dipole, f"{axis}_dipole"), f"{axis}_dipole", directory, manifest)
+    with open(os.path.join(directory, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f)
+
+def _load_problem(directory):
+    from qiskit_nature.second_q.formats.molecule_info import MoleculeInfo
+    from qiskit_nature.second_q.hamiltonians import ElectronicEnergy
+    from qiskit_nature.second_q.problems import ElectronicBasis, ElectronicStructureProblem
+    from qiskit_nature.second_q.properties import (
+        AngularMomentum, ElectronicDipoleMoment, Magnetization, ParticleNumber,
+    )
+
+    with open(os.path.join(directory, 'manifest.json')) as f:
+        manifest = json.load(f)
+
+    def optional(name):
+        path = os.path.join(directory, f"{name}.npy")
+        return np.load(path, mmap_mode='r') if os.path.exists(path) else None
+
+    hamiltonian = ElectronicEnergy(_load_integrals('hamiltonian', directory, manifest),
+                                   constants=manifest['constants'])
+    problem = ElectronicStructureProblem(hamiltonian)
+    norb = manifest['num_spatial_orbitals']
+    problem.num_spatial_orbitals = norb
+    problem.num_particles = tuple(manifest['num_particles'])
+    problem.reference_energy = manifest['reference_energy']
+    problem.basis = ElectronicBasis(manifest['basis'])
+    problem.orbital_energies = optional('orbital_energies')
+    problem.orbital_energies_b = optional('orbital_energies_b')
+    mol = manifest['molecule']
+    problem.molecule = MoleculeInfo(
+        mol['symbols'], [tuple(c) for c in mol['coords']], multiplicity=mol['multiplicity'],
+        charge=mol['charge'], units=DistanceUnit(mol['units']), masses=mol['masses'],
+    )
+
+    problem.properties.particle_number = ParticleNumber(norb)
+    problem.properties.angular_momentum = AngularMomentum(norb, optional('overlap'))
+    problem.properties.magnetization = Magnetization(norb)
+    if manifest['dipole'] is not None:
+        dipoles = [_load_integrals(f"{axis}_dipole", directory, manifest) for axis in 'xyz']
+        constants = {k: tuple(v) for k, v in manifest['dipole']['constants'].items()}
+        problem.properties.electronic_dipole_moment = ElectronicDipoleMoment(
+            *dipoles, constants=constants,
+            reverse_dipole_sign=manifest['dipole']['reverse_dipole_sign'],
+        )
+    return problem
+
+def _entry_size(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+# Drop least recently used entries until the cache fits in max_bytes
+def evict(cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, keep=None):
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.startswith('.'):
+            continue  # another worker's entry still being written
+        path = os.path.join(cache_dir, name)
+        manifest = os.path.join(path, 'manifest.json')
+        if os.path.exists(manifest):
+            entries.append((os.path.getmtime(manifest), name, _entry_size(path)))
+    total = sum(size for _, _, size in entries)
+    for _, name, size in sorted(entries):
+        if total <= max_bytes:
+            break
+        if name == keep:
+            continue
+        shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)
+        total -= size
+
+# Drop-in replacement for PySCFDriver(...).run() backed by the cache
+def run_driver(atom, unit=DistanceUnit.ANGSTROM, basis='sto3g', charge=0, spin=0,
+               cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    key = cache_key(atom, basis, charge, spin, unit)
+    path = os.path.join(cache_dir, key)
+    manifest = os.path.join(path, 'manifest.json')
+    if os.path.exists(manifest):
+        os.utime(manifest)
+        with stage('cache load'):
+            return _load_problem(path)
+
+    from qiskit_nature.second_q.drivers import PySCFDriver
+    with stage('scf'):
+        problem = PySCFDriver(atom=atom, unit=unit, basis=basis, charge=charge, spin=spin).run()
+
+    # Write into a private directory and rename it into place, so concurrent
+    # workers computing the same key never see a half-written entry
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = os.path.join(cache_dir, f".{key}.{uuid.uuid4().hex}")
+    os.makedirs(tmp)
+    _save_problem(problem, tmp)
+    # An entry that appeared meanwhile is kept unless other library versions wrote it
+    if os.path.exists(path) and _entry_versions(path) != _versions():
+        shutil.rmtree(path, ignore_errors=True)
+    try:
+        os.rename(tmp, path)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+    evict(cache_dir, max_bytes, keep=key)
+    return problem
@@ -1,6 +1,9 @@
-from qiskit import QuantumCircuit, transpile
+from qiskit import QuantumCircuit
 from qiskit_aer import AerSimulator
-import matplotlib.pyplot as plt
+
+import render
+from counts import Counts
+from transpile_cache import transpile_cached
 
 # Create a basic quantum circuit
 qc = QuantumCircuit(2,2)
@@ -10,18 +13,20 @@ qc.measure(0,0)
 qc.measure(1,1)
 # Visualize the original circuit
 print("Original Circuit:")
-print(qc.draw('mpl'))
+print(qc)
+render.circuit('qc2_original', qc)
 
 # Now transpile the circuit for the Aer simulator backend
 simulator = AerSimulator()
-transpiled_qc = transpile(qc, simulator)
+transpiled_qc = transpile_cached(qc, simulator)
 
 # Visualize the transpiled circuit
 print("\nTranspiled Circuit:")
-print(transpiled_qc.draw('mpl'))
+print(transpiled_qc)
+render.circuit('qc2_transpiled', transpiled_qc)
 result = simulator.run(transpiled_qc, shots=100000).result()
 
 # Get the measurement results
-counts = result.get_counts()
+counts = Counts.from_result(result)
 print("Measurement result:", counts)
-plt.show()
\ No newline at end of file
+render.finish()
\ No newline at end of file
@@ -1,6 +1,8 @@
-from qiskit import QuantumCircuit, transpile
+from qiskit import QuantumCircuit
 from qiskit_aer import AerSimulator
-import matplotlib.pyplot as plt
+
+import render
+from transpile_cache import transpile_cached
 
 # Create a simple quantum circuit
 qc = QuantumCircuit(3)
@@ -10,13 +12,15 @@ qc.cx(1, 2)  # Apply CNOT gate between qubit 1 and qubit 2
 
 # Visualize the original circuit
 print("Original Circuit:")
-print(qc.draw('mpl'))
+print(qc)
+render.circuit('qc_3_original', qc)
 
 # Transpile the circuit for the AerSimulator backend (simulate a real device)
 simulator = AerSimulator()
-transpiled_qc = transpile(qc, simulator,optimization_level=0)
+transpiled_qc = transpile_cached(qc, simulator, optimization_level=0)
 
 # Visualize the transpiled circuit
 print("\nTranspiled Circuit:")
-print(transpiled_qc.draw('mpl'))
-plt.show()
\ No newline at end of file
+print(transpiled_qc)
+render.circuit('qc_3_transpiled', transpiled_qc)
+render.finish()
\ No newline at end of file
@@ -1,7 +1,9 @@
-from qiskit import QuantumCircuit, transpile
+from qiskit import QuantumCircuit
 from qiskit.transpiler import CouplingMap
 from qiskit_aer import AerSimulator
-import matplotlib.pyplot as plt
+
+import render
+from transpile_cache import cache_info, transpile_cached
 
 # Create a circuit that assumes full connectivity
 qc = QuantumCircuit(3)
@@ -9,14 +11,17 @@ qc.cx(0, 2)  # This requires direct connection between qubit 0 and 2
 qc.measure_all()
 
 print("Original Circuit:")
-print(qc.draw('mpl'))
+print(qc)
+render.circuit('qc_4_original', qc)
 
 # Define a restricted coupling map (linear qubit connectivity)
 coupling = CouplingMap([[0, 1], [1, 2]])  # Only 0-1 and 1-2 connected
 #simulator = AerSimulator()
 # Transpile with the restricted connectivity
-transpiled_qc = transpile(qc, coupling_map=coupling, optimization_level=0)
+transpiled_qc = transpile_cached(qc, coupling_map=coupling, optimization_level=0)
 #transpiled_qc = transpile(qc, simulator, optimization_level=0)
+print("Transpile cache:", cache_info())  # misses on the first run, disk hits after
 print("\nTranspiled Circuit (with forced SWAPs):")
-print(transpiled_qc.draw('mpl'))
-plt.show()
\ No newline at end of file
+print(transpiled_qc)
+render.circuit('qc_4_transpiled', transpiled_qc)
+render.finish()
\ No newline at end of file
@@ -1,51 +1,145 @@
 from qiskit_nature.units import DistanceUnit
-from qiskit_nature.second_q.drivers import PySCFDriver
+from pyscf_cache import run_driver
 from qiskit_nature.second_q.mappers import ParityMapper
+from compile_cache import cached_mapper, uccsd_ansatz
 from qiskit.primitives import Estimator
 from qiskit_algorithms import VQE
+from qiskit_algorithms.gradients import ParamShiftEstimatorGradient
 from qiskit_algorithms.optimizers import SLSQP
-from qiskit_nature.second_q.circuit.library import HartreeFock, UCCSD
 from qiskit_nature.second_q.algorithms import GroundStateEigensolver
+from adjoint_gradient import AdjointEstimatorGradient
+from grouped_estimator import GroupedShotEstimator
+from reduction import active_space, print_report, reduce_problem
+from profiling import instrument_estimator, instrument_mapper, instrument_optimizer, stage, timed
+import profiling
+import argparse
 
-# 1. Define the molecule and driver
-driver = PySCFDriver(
-    atom="H 0 0 0; H 0 0 0.735",
-    unit=DistanceUnit.ANGSTROM,
-    basis="sto3g",
-    charge=0,
-    spin=0,
-)
-problem = driver.run()
-
-# 2. Define mapper
-mapper = ParityMapper()
-
-# 3. Setup Hartree-Fock and UCCSD ansatz
-num_particles = problem.num_particles
-num_spatial_orbitals = problem.num_spatial_orbitals
-
-initial_state = HartreeFock(
-    num_spatial_orbitals=num_spatial_orbitals,
-    num_particles=num_particles,
-    qubit_mapper=mapper,
-)
-
-ansatz = UCCSD(
-    num_spatial_orbitals=num_spatial_orbitals,
-    num_particles=num_particles,
-    qubit_mapper=mapper,
-    initial_state=initial_state,
-)
-
-# 4. Set up VQE
-estimator = Estimator()
-optimizer = SLSQP()
-vqe_solver = VQE(estimator=estimator, ansatz=ansatz, optimizer=optimizer)
-vqe_solver.initial_point = [0.0] * ansatz.num_parameters
+# 1. Define the molecule and run the driver (cached on disk after the first run)
+def driver_settings(distance=0.735):
+    return {
+        'atom': f"H 0 0 0; H 0 0 {distance}",
+        'unit': DistanceUnit.ANGSTROM,
+        'basis': "sto3g",
+        'charge': 0,
+        'spin': 0,
+    }
+
+def build_problem(distance=0.735):
+    return run_driver(**driver_settings(distance))
+
+# 2. Define mapper (mapped operators are cached in memory and on disk); the
+# script itself goes through reduction.reduce_problem, which also picks the
+# active space and tapers the mapper
+def build_mapper():
+    return cached_mapper(ParityMapper())
+
+# 3. Setup Hartree-Fock and UCCSD ansatz, transpiled once and cached
+def build_ansatz(problem, mapper):
+    return uccsd_ansatz(problem.num_spatial_orbitals, problem.num_particles, mapper)
+
+# 4. Set up VQE (exact Estimator unless a sampling one is passed in). A
+# sampling estimator also evaluates the parameter-shift gradient circuits,
+# so its circuit / shot totals cover everything the run measures.
+def build_vqe(ansatz, initial_point=None, estimator=None):
+    if estimator is None:
+        estimator = Estimator()
+        gradient = AdjointEstimatorGradient()  # full gradient in one forward/backward pass
+    else:
+        gradient = ParamShiftEstimatorGradient(estimator)
+    optimizer = SLSQP()
+    vqe_solver = VQE(estimator=estimator, ansatz=ansatz, optimizer=optimizer, gradient=gradient)
+    if initial_point is None:
+        initial_point = [0.0] * ansatz.num_parameters
+    vqe_solver.initial_point = initial_point
+    return vqe_solver
 
 # 5. Solve the ground state problem
-solver = GroundStateEigensolver(mapper, vqe_solver)
-result = solver.solve(problem)
+def solve(problem, mapper, vqe_solver):
+    solver = GroundStateEigensolver(mapper, vqe_solver)
+    return solver.solve(problem)
+
+# Same UCCSD VQE simulated in the particle-number sector (subspace_sim.py):
+# no mapper, circuit or Estimator, C(n, n_alpha) * C(n, n_beta) amplitudes.
+# Returns (total energy, SubspaceEnergy, scipy result).
+def solve_subspace(problem, initial_point=None):
+    from scipy.optimize import minimize
+    from subspace_sim import SubspaceEnergy
+    with stage('hamiltonian'):
+        energy = SubspaceEnergy(problem)
+    if initial_point is None:
+        initial_point = [0.0] * energy.num_parameters
+    with stage('optimizer'):
+        result = minimize(timed('objective')(energy), initial_point,
+                          jac=timed('gradient')(energy.gradient), method='SLSQP')
+    return result.fun + energy.total_shift, energy, result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="H2 ground state with VQE")
+    parser.add_argument('--precision', type=float,
+                        help="sample energies with grouped measurements to this standard error (Ha)")
+    parser.add_argument('--shots', type=int, help="sample energies with this many shots per evaluation")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--active-electrons', type=int, help="electrons in the active space")
+    parser.add_argument('--active-orbitals', type=int, help="spatial orbitals in the active space")
+    parser.add_argument('--no-freeze-core', action='store_true')
+    parser.add_argument('--no-taper', action='store_true', help="skip the two-qubit reduction and Z2 tapering")
+    parser.add_argument('--subspace', action='store_true',
+                        help="simulate UCCSD in the particle-number sector instead of on qubits")
+    parser.add_argument('--timings', action='store_true', help="print the per-stage timing report")
+    parser.add_argument('--profile-dir', default=profiling.PROFILE_DIR,
+                        help="write stages.json / stages.folded (and profile.prof) here")
+    parser.add_argument('--cprofile', action='store_true', default=profiling.CPROFILE)
+    parser.add_argument('--tracemalloc', action='store_true', default=profiling.TRACEMALLOC)
+    args = parser.parse_args()
+    if (args.active_electrons is None) != (args.active_orbitals is None):
+        parser.error("--active-electrons and --active-orbitals must be given together")
+    profiling.start(args.cprofile, args.tracemalloc)
+
+    estimator = None
+    if args.precision is not None or args.shots is not None:
+        estimator = GroupedShotEstimator(precision=args.precision or 1.6e-3, shots=args.shots, seed=args.seed)
+
+    with stage('driver'):
+        problem = build_problem()
+    if args.subspace:
+        with stage('reduction'):
+            problem = active_space(problem, not args.no_freeze_core, args.active_electrons, args.active_orbitals)
+        with stage('solve'):
+            energy, subspace, _ = solve_subspace(problem)
+        basis = subspace.basis
+        print(f"Particle-number sector: {basis.dim} amplitudes instead of {2 ** basis.num_qubits} "
+              f"({basis.compression():.0f}x smaller), {subspace.num_parameters} parameters")
+        print(f"Ground state energy: {energy:.6f} Ha")
+    else:
+        with stage('reduction'):
+            problem, mapper, report = reduce_problem(
+                problem,
+                freeze_core=not args.no_freeze_core,
+                num_electrons=args.active_electrons,
+                num_spatial_orbitals=args.active_orbitals,
+                two_qubit_reduction=not args.no_taper,
+                taper=not args.no_taper,
+            )
+        print_report(report)
+        with stage('ansatz'):
+            ansatz = build_ansatz(problem, mapper)
+        vqe_solver = build_vqe(ansatz, estimator=estimator)
+        instrument_mapper(mapper)
+        instrument_estimator(vqe_solver.estimator)
+        instrument_optimizer(vqe_solver.optimizer)
+        with stage('solve'):
+            result = solve(problem, mapper, vqe_solver)
+
+        # 6. Print result
+        print(f"Ground state energy: {result.total_energies[0]:.6f} Ha")
+        if estimator is not None:
+            t, saved = estimator.totals, estimator.savings()
+            print(f"Estimator evaluations: {t['evaluations']}")
+            print(f"Circuits: {t['circuits']} grouped vs {t['term_circuits']} term-by-term "
+                  f"({saved['circuits_saved']} saved, {saved['circuit_ratio']:.1f}x)")
+            print(f"Shots: {t['shots']} grouped vs {t['term_shots']} term-by-term "
+                  f"({saved['shots_saved']} saved, {saved['shot_ratio']:.1f}x)")
 
-# 6. Print result
-print(f"Ground state energy: {result.total_energies[0]:.6f} Ha")
+    timings = profiling.finish(args.profile_dir)
+    if args.timings or args.profile_dir:
+        profiling.print_report(timings)
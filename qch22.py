@@ -1,31 +1,34 @@
 from qiskit_nature.units import DistanceUnit
-from qiskit_nature.second_q.drivers import PySCFDriver
+from pyscf_cache import run_driver
 from qiskit_nature.second_q.mappers import ParityMapper
 from qiskit.primitives import Estimator
 from qiskit_algorithms import VQE
 from qiskit_algorithms.optimizers import SLSQP
 from qiskit_nature.second_q.circuit.library import HartreeFock, UCCSD
 from qiskit_nature.second_q.algorithms import GroundStateEigensolver
+from adjoint_gradient import AdjointEstimatorGradient
+import render
 
-# For visualization
-from ase import Atoms
-from ase.visualize import view
+# For visualization; ASE is only imported and its GUI only opened in
+# interactive runs (render.MODE == 'show'), never in batch jobs
+if render.MODE == 'show':
+    from ase import Atoms
+    from ase.visualize import view
 
-# Define H2 molecule with positions in angstroms
-h2_molecule = Atoms('H2', positions=[[0, 0, 0], [0, 0, 0.735]])
-view(h2_molecule)  # This opens the GUI
+    # Define H2 molecule with positions in angstroms
+    h2_molecule = Atoms('H2', positions=[[0, 0, 0], [0, 0, 0.735]])
+    view(h2_molecule)  # This opens the GUI
 
 # === Quantum Chemistry Calculation ===
 
-# 1. Define the molecule and driver
-driver = PySCFDriver(
+# 1. Define the molecule and run the driver (cached on disk after the first run)
+problem = run_driver(
     atom="H 0 0 0; H 0 0 0.735",
     unit=DistanceUnit.ANGSTROM,
     basis="sto3g",
     charge=0,
     spin=0,
 )
-problem = driver.run()
 
 # 2. Define mapper
 mapper = ParityMapper()
@@ -50,7 +53,8 @@ ansatz = UCCSD(
 # 4. Set up VQE
 estimator = Estimator()
 optimizer = SLSQP()
-vqe_solver = VQE(estimator=estimator, ansatz=ansatz, optimizer=optimizer)
+gradient = AdjointEstimatorGradient()  # full gradient in one forward/backward pass
+vqe_solver = VQE(estimator=estimator, ansatz=ansatz, optimizer=optimizer, gradient=gradient)
 vqe_solver.initial_point = [0.0] * ansatz.num_parameters
 
 # 5. Solve the ground state problem
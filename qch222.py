@@ -1,81 +1,88 @@
 from qiskit_nature.units import DistanceUnit
-from qiskit_nature.second_q.drivers import PySCFDriver
+from pyscf_cache import run_driver
 from qiskit_nature.second_q.mappers import ParityMapper
+from compile_cache import cached_mapper, uccsd_ansatz
 from qiskit.primitives import Estimator
 from qiskit_algorithms import VQE
 from qiskit_algorithms.optimizers import SLSQP
-from qiskit_nature.second_q.circuit.library import HartreeFock, UCCSD
 from qiskit_nature.second_q.algorithms import GroundStateEigensolver
-from qiskit_nature.second_q.algorithms.excited_states_solvers import QEOM
+from adjoint_gradient import AdjointEstimatorGradient
+from vectorized_qeom import VectorizedQEOM
+from profiling import instrument, instrument_estimator, instrument_mapper, instrument_optimizer, stage
+import profiling
+import render
 
-# 1. Define the molecule and driver
-driver = PySCFDriver(
-    atom="H 0 0 0; H 0 0 0.735",
-    unit=DistanceUnit.ANGSTROM,
-    basis="sto3g",
-    charge=0,
-    spin=0,
-)
-problem = driver.run()
+def solve_excited_states(distance=0.735):
+    # 1. Define the molecule and run the driver (cached on disk after the first run)
+    with stage('driver'):
+        problem = run_driver(
+            atom=f"H 0 0 0; H 0 0 {distance}",
+            unit=DistanceUnit.ANGSTROM,
+            basis="sto3g",
+            charge=0,
+            spin=0,
+        )
 
-# 2. Define mapper
-mapper = ParityMapper()
+    # 2. Define mapper (mapped operators are cached in memory and on disk)
+    mapper = cached_mapper(ParityMapper())
 
-# 3. Setup Hartree-Fock and UCCSD ansatz
-num_particles = problem.num_particles
-num_spatial_orbitals = problem.num_spatial_orbitals
+    # 3. Setup Hartree-Fock and UCCSD ansatz, transpiled once and cached
+    with stage('ansatz'):
+        ansatz = uccsd_ansatz(problem.num_spatial_orbitals, problem.num_particles, mapper)
 
-initial_state = HartreeFock(
-    num_spatial_orbitals=num_spatial_orbitals,
-    num_particles=num_particles,
-    qubit_mapper=mapper,
-)
+    # 4. Set up VQE
+    estimator = Estimator()
+    optimizer = SLSQP()
+    gradient = AdjointEstimatorGradient()  # full gradient in one forward/backward pass
+    vqe_solver = VQE(estimator=estimator, ansatz=ansatz, optimizer=optimizer, gradient=gradient)
+    vqe_solver.initial_point = [0.0] * ansatz.num_parameters
 
-ansatz = UCCSD(
-    num_spatial_orbitals=num_spatial_orbitals,
-    num_particles=num_particles,
-    qubit_mapper=mapper,
-    initial_state=initial_state,
-)
+    # 5. Create ground-state solver
+    gse_solver = GroundStateEigensolver(mapper, vqe_solver)
 
-# 4. Set up VQE
-estimator = Estimator()
-optimizer = SLSQP()
-vqe_solver = VQE(estimator=estimator, ansatz=ansatz, optimizer=optimizer)
-vqe_solver.initial_point = [0.0] * ansatz.num_parameters
+    # 6. QEOM Excited state solver (EOM matrices evaluated on the statevector)
+    qeom_solver = VectorizedQEOM(gse_solver, estimator)
+    instrument_mapper(mapper)
+    instrument_estimator(estimator)
+    instrument_optimizer(optimizer)
+    instrument(qeom_solver, '_build_qeom_pseudoeigenvalue_problem', 'qeom matrices')
 
-# 5. Create ground-state solver
-gse_solver = GroundStateEigensolver(mapper, vqe_solver)
+    # 7. Solve for excited states
+    with stage('solve'):
+        return qeom_solver.solve(problem)
 
-# 6. QEOM Excited state solver
-qeom_solver = QEOM(gse_solver, estimator)
+def draw_levels(fig, energies):
+    ax = fig.subplots()
+    for i, energy in enumerate(energies):
+        label = "Ground state" if i == 0 else f"Excited state {i}"
+        ax.hlines(energy, xmin=0.3, xmax=0.7, colors='blue' if i == 0 else 'orange')
+        ax.text(0.75, energy, f"{label}\n{energy:.4f} Ha", va='center')
 
-# 7. Solve for excited states
-excited_result = qeom_solver.solve(problem)
+    ax.set_xlabel("States")
+    ax.set_ylabel("Energy (Ha)")
+    ax.set_title("Electronic Energy Levels of H₂")
+    ax.set_yticks([])
+    ax.set_xticks([])
+    ax.grid(False)
+    fig.tight_layout()
 
-# 8. Print energy levels
-print("\nElectronic Energy Levels (Hartree):")
-energies = excited_result.total_energies
-print(f"Ground state: {energies[0]:.6f} Ha")
-for i, energy in enumerate(energies[1:], start=1):
-    delta_e = energy - energies[0]
-    print(f"Excited state {i}: {energy:.6f} Ha (ΔE = {delta_e:.6f})")
-import matplotlib.pyplot as plt
+if __name__ == "__main__":
+    # Per-stage timings; PROFILE_DIR / PROFILE_CPROFILE / PROFILE_TRACEMALLOC
+    # select the report files and optional captures (see profiling.py)
+    profiling.start()
+    excited_result = solve_excited_states()
 
-energies = excited_result.total_energies
-ground_energy = energies[0]
+    # 8. Print energy levels
+    print("\nElectronic Energy Levels (Hartree):")
+    energies = excited_result.total_energies
+    print(f"Ground state: {energies[0]:.6f} Ha")
+    for i, energy in enumerate(energies[1:], start=1):
+        delta_e = energy - energies[0]
+        print(f"Excited state {i}: {energy:.6f} Ha (ΔE = {delta_e:.6f})")
 
-plt.figure(figsize=(6, 4))
-for i, energy in enumerate(energies):
-    label = "Ground state" if i == 0 else f"Excited state {i}"
-    plt.hlines(energy, xmin=0.3, xmax=0.7, colors='blue' if i == 0 else 'orange')
-    plt.text(0.75, energy, f"{label}\n{energy:.4f} Ha", va='center')
+    render.figure('qch222_levels', draw_levels, excited_result.total_energies)
+    render.finish()
 
-plt.xlabel("States")
-plt.ylabel("Energy (Ha)")
-plt.title("Electronic Energy Levels of H₂")
-plt.yticks([])
-plt.xticks([])
-plt.grid(False)
-plt.tight_layout()
-plt.show()
+    timings = profiling.finish()
+    if profiling.PROFILE_DIR:
+        profiling.print_report(timings)
@@ -0,0 +1,93 @@
+from qiskit_nature.second_q.mappers import ParityMapper, TaperedQubitMapper
+from qiskit_nature.second_q.transformers import ActiveSpaceTransformer, FreezeCoreTransformer
+
+from compile_cache import cached_mapper, excitation_list, uccsd_ansatz
+
+# Problem reduction between driver.run() and the mapper, so VQE works on as
+# few qubits as the problem allows:
+#   1. active space - freeze the core orbitals, then optionally keep only
+#      num_spatial_orbitals orbitals around the Fermi level (their energy
+#      is folded into the Hamiltonian constants, so total energies are
+#      unchanged);
+#   2. two-qubit reduction - ParityMapper with the particle numbers drops
+#      the two qubits holding the alpha / beta particle-number parities;
+#   3. Z2 tapering - the remaining Z2 symmetries of the qubit Hamiltonian
+#      are found and each removes one more qubit. The sector is the one
+#      holding the Hartree-Fock state, located by the problem itself.
+# Every qubit removed halves the statevector every estimator call works on.
+# The mapper that comes out is cached (compile_cache), and uccsd_ansatz
+# builds the HartreeFock / UCCSD circuit directly in the tapered space,
+# where excitations that do not commute with the symmetries drop out too.
+
+def active_space(problem, freeze_core=True, num_electrons=None, num_spatial_orbitals=None,
+                 active_orbitals=None):
+    if num_electrons is not None and num_spatial_orbitals is None:
+        raise ValueError("num_electrons needs num_spatial_orbitals to define the active space")
+    if freeze_core:
+        problem = FreezeCoreTransformer(freeze_core=True).transform(problem)
+    if num_spatial_orbitals is not None:
+        if num_electrons is None:
+            num_electrons = sum(problem.num_particles)
+        problem = ActiveSpaceTransformer(num_electrons, num_spatial_orbitals, active_orbitals).transform(problem)
+    return problem
+
+def reduction_mapper(problem, two_qubit_reduction=True, taper=True):
+    mapper = cached_mapper(ParityMapper(num_particles=problem.num_particles if two_qubit_reduction else None))
+    if taper:
+        mapper = problem.get_tapered_mapper(mapper)
+    return mapper
+
+# Parameters are counted from the excitation list, except after tapering,
+# where they come from the (cached) ansatz build_ansatz will use anyway
+def _stage(name, problem, num_qubits, mapper=None):
+    if mapper is None:
+        parameters = len(excitation_list(problem.num_spatial_orbitals, problem.num_particles))
+    else:
+        parameters = uccsd_ansatz(problem.num_spatial_orbitals, problem.num_particles, mapper).num_parameters
+    return {
+        'stage': name,
+        'spatial_orbitals': problem.num_spatial_orbitals,
+        'num_particles': tuple(problem.num_particles),
+        'qubits': num_qubits,
+        'parameters': parameters,
+    }
+
+# Returns (reduced problem, mapper, report). The report lists the qubit and
+# UCCSD parameter counts after every stage, starting from the full problem
+# mapped without any reduction.
+def reduce_problem(problem, freeze_core=True, num_electrons=None, num_spatial_orbitals=None,
+                   active_orbitals=None, two_qubit_reduction=True, taper=True):
+    reduced = active_space(problem, freeze_core, num_electrons, num_spatial_orbitals, active_orbitals)
+    mapper = reduction_mapper(reduced, two_qubit_reduction, taper)
+
+    stages = [_stage('full', problem, 2 * problem.num_spatial_orbitals),
+              _stage('active space', reduced, 2 * reduced.num_spatial_orbitals)]
+    qubits = stages[-1]['qubits']
+    if two_qubit_reduction:
+        qubits -= 2
+        stages.append(_stage('two-qubit reduction', reduced, qubits))
+    symmetries = []
+    if isinstance(mapper, TaperedQubitMapper):
+        z2 = mapper.z2symmetries
+        symmetries = [{'symmetry': sym.to_label(), 'qubit': int(q), 'value': int(v)}
+                      for sym, q, v in zip(z2.symmetries, z2.sq_list, z2.tapering_values)]
+        qubits -= len(z2.sq_list)
+        stages.append(_stage('Z2 tapering', reduced, qubits, mapper))
+    report = {
+        'stages': stages,
+        'symmetries': symmetries,
+        'qubits_removed': stages[0]['qubits'] - qubits,
+        'parameters_removed': stages[0]['parameters'] - stages[-1]['parameters'],
+    }
+    return reduced, mapper, report
+
+def print_report(report):
+    print(f"{'stage':>20} {'orbitals':>8} {'particles':>9} {'qubits':>6} {'params':>6}")
+    for s in report['stages']:
+        particles = f"{s['num_particles'][0]}a+{s['num_particles'][1]}b"
+        print(f"{s['stage']:>20} {s['spatial_orbitals']:>8} {particles:>9} {s['qubits']:>6} {s['parameters']:>6}")
+    for sym in report['symmetries']:
+        print(f"tapered qubit {sym['qubit']} with symmetry {sym['symmetry']} in sector {sym['value']:+d}")
+    print(f"{report['qubits_removed']} qubits removed "
+          f"(statevector {2 ** report['qubits_removed']}x smaller), "
+          f"{report['parameters_removed']} ansatz parameters removed")
@@ -0,0 +1,145 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import atexit
+import os
+import sys
+
+# Deferred figure rendering, kept off the simulation path.
+#
+# Scripts describe a figure as a module-level draw(fig, *args) function plus
+# its data and hand it to figure(); circuit diagrams go through circuit().
+# Nothing is imported from matplotlib until a figure is actually rendered.
+# What happens then depends on the mode:
+#   'off'  - figures are dropped (default when stdout is not a terminal,
+#            i.e. batch runs);
+#   'file' - each figure is rendered with the Agg canvas by a background
+#            worker (a thread, or a process with use_process) and saved as
+#            RENDER_DIR/<name>.png or .svg; submit returns immediately;
+#   'show' - figures are collected and drawn with pyplot in finish(), after
+#            the computation (default on an interactive terminal).
+# Circuits above MAX_MPL_QUBITS qubits or MAX_MPL_OPS operations are drawn
+# as text instead of with the matplotlib drawer. finish() waits for
+# outstanding renders and runs at interpreter exit as well.
+
+MODES = ('off', 'file', 'show')
+MODE = os.environ.get('RENDER_MODE') or ('show' if sys.stdout.isatty() else 'off')
+DIRECTORY = os.environ.get('RENDER_DIR', 'figures')
+FORMAT = os.environ.get('RENDER_FORMAT', 'png')
+USE_PROCESS = os.environ.get('RENDER_PROCESS', '') == '1'
+
+# Beyond this the mpl circuit drawer is slow and the diagram unreadable
+MAX_MPL_QUBITS = 16
+MAX_MPL_OPS = 400
+
+_executor = None
+_pending = []
+_deferred = []
+
+def configure(mode=None, directory=None, fmt=None, use_process=None):
+    global MODE, DIRECTORY, FORMAT, USE_PROCESS
+    if mode is not None:
+        if mode not in MODES:
+            raise ValueError(f"unknown render mode '{mode}', expected one of {MODES}")
+        MODE = mode
+    if directory is not None:
+        DIRECTORY = directory
+    if fmt is not None:
+        if fmt not in ('png', 'svg'):
+            raise ValueError(f"unsupported figure format '{fmt}'")
+        FORMAT = fmt
+    if use_process is not None:
+        USE_PROCESS = use_process
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=1) if USE_PROCESS else ThreadPoolExecutor(max_workers=1)
+    return _executor
+
+def _too_large(qc):
+    return qc.num_qubits > MAX_MPL_QUBITS or len(qc.data) > MAX_MPL_OPS
+
+def _text_diagram(qc):
+    return str(qc.draw('text', fold=-1))
+
+# Circuit into an existing axes: the mpl drawer for small circuits, the text
+# diagram in a monospace font otherwise
+def draw_circuit(ax, qc):
+    ax.axis('off')
+    if _too_large(qc):
+        ax.text(0, 1, _text_diagram(qc), family='monospace', fontsize=4, va='top', ha='left',
+                transform=ax.transAxes)
+    else:
+        qc.draw('mpl', ax=ax)
+
+def _draw_circuit_figure(fig, qc):
+    draw_circuit(fig.add_subplot(), qc)
+
+# Runs in the worker; uses the Agg canvas directly, never pyplot
+def _render_to_file(path, draw, args, figsize):
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=figsize)
+    draw(fig, *args)
+    fig.savefig(path, bbox_inches='tight')
+    return path
+
+def _write_text(path, text):
+    with open(path, 'w') as f:
+        f.write(text)
+    return path
+
+def _path(name, ext):
+    os.makedirs(DIRECTORY, exist_ok=True)
+    return os.path.join(DIRECTORY, f"{name}.{ext}")
+
+def _submit(fn, *args):
+    future = _get_executor().submit(fn, *args)
+    _pending.append(future)
+    return future
+
+# Queue draw(fig, *args) as figure `name`. Returns a future of the written
+# path in 'file' mode, None otherwise.
+def figure(name, draw, *args, figsize=(6, 4)):
+    if MODE == 'off':
+        return None
+    if MODE == 'show':
+        _deferred.append((draw, args, figsize))
+        return None
+    return _submit(_render_to_file, _path(name, FORMAT), draw, args, figsize)
+
+# Queue a diagram of `qc`; large circuits become a .txt diagram
+def circuit(name, qc):
+    if MODE == 'off':
+        return None
+    if _too_large(qc):
+        if MODE == 'show':
+            print(_text_diagram(qc))
+            return None
+        return _submit(_write_text, _path(name, 'txt'), _text_diagram(qc))
+    width = min(2 + 0.6 * qc.depth(), 40)
+    height = 1 + 0.6 * (qc.num_qubits + (qc.num_clbits > 0))
+    # the worker may run after the caller has changed the circuit
+    return figure(name, _draw_circuit_figure, qc.copy(), figsize=(width, height))
+
+# Wait for every queued figure; in 'show' mode draw and show them now.
+# Returns the paths written since the last call.
+def finish():
+    global _executor
+    paths = []
+    while _pending:
+        future = _pending.pop(0)
+        try:
+            paths.append(future.result())
+        except Exception as exc:
+            print(f"render: figure failed: {exc!r}", file=sys.stderr)
+    if _deferred:
+        import matplotlib.pyplot as plt
+        while _deferred:
+            draw, args, figsize = _deferred.pop(0)
+            draw(plt.figure(figsize=figsize), *args)
+        plt.show()
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+    return paths
+
+atexit.register(finish)
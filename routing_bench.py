@@ -0,0 +1,161 @@
+from concurrent.futures import ProcessPoolExecutor
+from qiskit import QuantumCircuit, transpile
+from qiskit.transpiler import CouplingMap
+import numpy as np
+import argparse
+import csv
+import math
+import os
+import time
+
+# Routing overhead benchmark: how transpile time, inserted SWAPs, depth and
+# two-qubit gate count scale with circuit size, device topology and
+# optimization level. Every (family, qubits, topology, level) case is an
+# independent job in a process pool. The transpile time is the median of
+# `repeats` plain runs; the SWAP count comes from one extra run with a pass
+# callback (same seed, so the same result) that records the largest number
+# of swap gates any intermediate DAG held, i.e. what routing inserted before
+# the basis translation expanded them into CX.
+
+BASIS_GATES = ['cx', 'rz', 'sx', 'x']
+TOPOLOGIES = ['line', 'ring', 'grid', 'heavy_hex']
+LEVELS = [0, 1, 2, 3]
+REPEATS = 3
+
+# GHZ chain exactly as benchmarked in kg1
+def ghz_circuit(n):
+    from kg1 import create_clifford_circuit
+    return create_clifford_circuit(n)
+
+# CX between mirrored qubits (0, n-1), (1, n-2), ... on a superposition:
+# every gate spans the register, the worst case for a line
+def long_range_circuit(n):
+    qc = QuantumCircuit(n)
+    qc.h(range(n))
+    for i in range(n // 2):
+        qc.cx(i, n - 1 - i)
+    for i in range(n // 2 - 1):
+        qc.cx(n - 2 - i, i + 1)
+    qc.measure_all()
+    return qc
+
+# qch2-style HartreeFock + UCCSD on n/2 spatial orbitals at half filling,
+# Jordan-Wigner mapped; needs the qiskit-nature environment
+def uccsd_circuit(n):
+    from qiskit_nature.second_q.mappers import JordanWignerMapper
+    from compile_cache import cached_mapper, uccsd_ansatz
+    if n % 2 or n < 4:
+        raise ValueError("UCCSD needs an even number of qubits >= 4")
+    num_orbitals = n // 2
+    num_particles = (num_orbitals // 2, num_orbitals // 2)
+    return uccsd_ansatz(num_orbitals, num_particles, cached_mapper(JordanWignerMapper()))
+
+FAMILIES = {'ghz': ghz_circuit, 'long_range': long_range_circuit, 'uccsd': uccsd_circuit}
+
+# Smallest device of the given topology with at least n qubits
+def coupling_map(topology, n):
+    if topology == 'line':
+        return CouplingMap.from_line(n)
+    if topology == 'ring':
+        return CouplingMap.from_ring(n)
+    if topology == 'grid':
+        rows = max(int(math.sqrt(n)), 1)
+        return CouplingMap.from_grid(rows, math.ceil(n / rows))
+    if topology == 'heavy_hex':
+        d = 3
+        while (5 * d * d - 2 * d - 1) // 2 < n:
+            d += 2
+        return CouplingMap.from_heavy_hex(d)
+    raise ValueError(f"unknown topology '{topology}'")
+
+def _two_qubit_count(qc):
+    return sum(1 for inst in qc.data if inst.operation.num_qubits == 2 and inst.operation.name != 'barrier')
+
+def run_case(family, n, topology, level, seed=11, repeats=REPEATS):
+    qc = FAMILIES[family](n)
+    cmap = coupling_map(topology, n)
+    options = dict(coupling_map=cmap, basis_gates=BASIS_GATES, optimization_level=level,
+                   seed_transpiler=seed)
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        out = transpile(qc, **options)
+        times.append(time.perf_counter() - start)
+
+    swaps = [0]
+    def count_swaps(dag, **_):
+        swaps[0] = max(swaps[0], dag.count_ops().get('swap', 0))
+    transpile(qc, callback=count_swaps, **options)
+
+    return {
+        'family': family,
+        'num_qubits': n,
+        'topology': topology,
+        'physical_qubits': cmap.size(),
+        'level': level,
+        'transpile_s': float(np.median(times)),
+        'swaps': swaps[0] - qc.count_ops().get('swap', 0),
+        'depth_in': qc.depth(),
+        'depth': out.depth(),
+        'two_qubit_in': _two_qubit_count(qc),
+        'two_qubit': _two_qubit_count(out),
+    }
+
+def _run_case(args):
+    try:
+        return run_case(*args)
+    except (ImportError, ValueError) as exc:
+        family, n, topology, level = args[:4]
+        return {'family': family, 'num_qubits': n, 'topology': topology, 'level': level, 'error': str(exc)}
+
+# All combinations in parallel; returns (rows sorted by case, wall time)
+def run_suite(families, qubit_list, topologies=TOPOLOGIES, levels=LEVELS, seed=11,
+              repeats=REPEATS, max_workers=None):
+    cases = [(family, n, topology, level, seed, repeats)
+             for family in families for n in qubit_list for topology in topologies for level in levels]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+        rows = list(pool.map(_run_case, cases))
+    wall_time = time.perf_counter() - start
+    rows.sort(key=lambda r: (r['family'], r['num_qubits'], TOPOLOGIES.index(r['topology']), r['level']))
+    return rows, wall_time
+
+COLUMNS = ['family', 'num_qubits', 'topology', 'physical_qubits', 'level', 'transpile_s', 'swaps',
+           'depth_in', 'depth', 'two_qubit_in', 'two_qubit']
+
+def print_table(rows):
+    print(f"{'family':>10} {'n':>4} {'topology':>9} {'phys':>5} {'lvl':>3} {'time (s)':>9} "
+          f"{'swaps':>6} {'depth':>13} {'2q gates':>13}")
+    for r in rows:
+        if 'error' in r:
+            print(f"{r['family']:>10} {r['num_qubits']:>4} {r['topology']:>9} {'':>5} {r['level']:>3}"
+                  f"  skipped: {r['error']}")
+            continue
+        print(f"{r['family']:>10} {r['num_qubits']:>4} {r['topology']:>9} {r['physical_qubits']:>5} "
+              f"{r['level']:>3} {r['transpile_s']:>9.4f} {r['swaps']:>6} "
+              f"{r['depth_in']:>5} -> {r['depth']:<5} {r['two_qubit_in']:>5} -> {r['two_qubit']:<5}")
+
+def save_csv(rows, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS + ['error'])
+        writer.writeheader()
+        writer.writerows(rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Routing / SWAP overhead across coupling topologies")
+    parser.add_argument('--families', nargs='*', default=['ghz', 'long_range', 'uccsd'], choices=list(FAMILIES))
+    parser.add_argument('--qubits', type=int, nargs='*', default=[4, 8, 16, 32])
+    parser.add_argument('--topologies', nargs='*', default=TOPOLOGIES, choices=TOPOLOGIES)
+    parser.add_argument('--levels', type=int, nargs='*', default=LEVELS)
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    parser.add_argument('--seed', type=int, default=11)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--csv', help="also write the results table to this CSV file")
+    args = parser.parse_args()
+
+    rows, wall_time = run_suite(args.families, args.qubits, args.topologies, args.levels,
+                                args.seed, args.repeats, args.workers)
+    print_table(rows)
+    print(f"{len(rows)} cases in {wall_time:.1f}s")
+    if args.csv:
+        save_csv(rows, args.csv)
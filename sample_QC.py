@@ -1,6 +1,9 @@
-from qiskit import QuantumCircuit, transpile
+from qiskit import QuantumCircuit
 from qiskit_aer import AerSimulator
 
+from counts import Counts
+from transpile_cache import transpile_cached
+
 # Create a simple quantum circuit
 qc = QuantumCircuit(1, 1)
 qc.h(0)
@@ -10,11 +13,11 @@ qc.measure(0, 0)
 simulator = AerSimulator()
 
 # Transpile the circuit for the simulator
-compiled_circuit = transpile(qc, simulator)
+compiled_circuit = transpile_cached(qc, simulator)
 
 # Run the simulation
 result = simulator.run(compiled_circuit, shots=100000).result()
 
 # Get the measurement results
-counts = result.get_counts()
+counts = Counts.from_result(result)
 print("Measurement result:", counts)
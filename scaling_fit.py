@@ -0,0 +1,157 @@
+import numpy as np
+import argparse
+import json
+
+# Fit scaling laws to recorded sweep timings so the exponential wall can be
+# located without running the expensive top end of the sweep. Every method's
+# (num_qubits, seconds) series is fitted with
+#   polynomial:  t = a * n^k       (straight line in log t vs log n)
+#   exponential: t = a * g^n       (straight line in log t vs n)
+# and the model with the smaller log-space residual is used to extrapolate.
+
+# Points below this size are dominated by fixed job overhead, not scaling
+MIN_QUBITS = 8
+
+def fit_series(ns, values, min_qubits=MIN_QUBITS):
+    ns = np.asarray(ns, dtype=float)
+    values = np.asarray(values, dtype=float)
+    keep = (ns >= min_qubits) & (values > 0)
+    if keep.sum() < 3:
+        keep = values > 0
+    ns, log_v = ns[keep], np.log(values[keep])
+    if len(ns) < 2:
+        raise ValueError("need at least two positive points to fit a scaling law")
+
+    k, log_a_poly = np.polyfit(np.log(ns), log_v, 1)
+    rss_poly = np.sum((log_a_poly + k * np.log(ns) - log_v) ** 2)
+    b, log_a_exp = np.polyfit(ns, log_v, 1)
+    rss_exp = np.sum((log_a_exp + b * ns - log_v) ** 2)
+
+    return {
+        'polynomial': {'a': float(np.exp(log_a_poly)), 'degree': float(k), 'rss': float(rss_poly)},
+        'exponential': {'a': float(np.exp(log_a_exp)), 'growth': float(np.exp(b)), 'rss': float(rss_exp)},
+        'best': 'exponential' if rss_exp < rss_poly else 'polynomial',
+        'qubit_range': [int(ns.min()), int(ns.max())],
+    }
+
+def predict(fit, n, model=None):
+    model = model or fit['best']
+    n = np.asarray(n, dtype=float)
+    if model == 'polynomial':
+        p = fit['polynomial']
+        return p['a'] * n ** p['degree']
+    p = fit['exponential']
+    # large n is allowed to overflow to inf
+    with np.errstate(over='ignore'):
+        return np.exp(np.log(p['a']) + n * np.log(p['growth']))
+
+# Memory in MB: the peak-RSS fit where the series recorded per-case memory,
+# else the analytic model of parallel_sweep for known methods
+def predict_memory_mb(method, fits, n):
+    if 'memory_mb' in fits.get(method, {}):
+        return float(predict(fits[method]['memory_mb'], n))
+    from parallel_sweep import method_memory_bytes
+    if method in ('statevector', 'stabilizer', 'numpy_tableau', 'matrix_product_state'):
+        try:
+            return method_memory_bytes(int(n), method) / 1024 ** 2
+        except OverflowError:
+            return float('inf')
+    return None
+
+# Largest qubit count whose predicted memory stays within `budget_mb`
+def max_feasible_memory_qubits(method, fits, budget_mb, max_qubits=100000):
+    lo, hi = 0, max_qubits
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        mem = predict_memory_mb(method, fits, mid)
+        if mem is not None and mem <= budget_mb:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+# Largest qubit count whose predicted value stays within `budget`
+def max_feasible_qubits(fit, budget, max_qubits=100000):
+    ns = np.arange(1, max_qubits + 1)
+    ok = np.flatnonzero(predict(fit, ns) <= budget)
+    return int(ns[ok[-1]]) if len(ok) else 0
+
+# Qubit counts where method `a` and method `b` swap places in predicted cost
+def crossovers(fit_a, fit_b, max_qubits=100000):
+    ns = np.arange(1, max_qubits + 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        diff = np.log(predict(fit_a, ns)) - np.log(predict(fit_b, ns))
+    sign = np.sign(diff)
+    flips = np.flatnonzero(sign[1:] * sign[:-1] < 0)
+    return [(int(ns[i + 1]), 'cheaper' if diff[i + 1] < 0 else 'more expensive') for i in flips]
+
+# {method: {'num_qubits': [...], 'time': [...], 'memory_mb': [...]}} from a
+# benchmark.py JSON baseline; memory is only fitted from per-case peaks
+def series_from_baseline(baseline):
+    series = {}
+    per_case = all(case.get('peak_rss_scope') == 'case' for case in baseline['cases'].values())
+    for case in baseline['cases'].values():
+        s = series.setdefault(case['method'], {'num_qubits': [], 'time': [], 'memory_mb': []})
+        s['num_qubits'].append(case['num_qubits'])
+        s['time'].append(case['total']['median'])
+        if per_case:
+            s['memory_mb'].append(case['peak_rss_mb'])
+    return series
+
+# Same layout from the {(kind, n): (counts, elapsed, method, info)} dict of kg1.run_sweep
+def series_from_sweep(sweep):
+    series = {}
+    for (kind, n), (_, elapsed, method, _) in sorted(sweep.items(), key=lambda item: item[0][1]):
+        s = series.setdefault(method, {'num_qubits': [], 'time': [], 'memory_mb': []})
+        s['num_qubits'].append(n)
+        s['time'].append(elapsed)
+    return series
+
+def fit_all(series, min_qubits=MIN_QUBITS):
+    fits = {}
+    for method, s in series.items():
+        fits[method] = {'time': fit_series(s['num_qubits'], s['time'], min_qubits)}
+        if s['memory_mb']:
+            fits[method]['memory_mb'] = fit_series(s['num_qubits'], s['memory_mb'], min_qubits)
+    return fits
+
+def _describe(fit):
+    if fit['best'] == 'polynomial':
+        return f"~ n^{fit['polynomial']['degree']:.2f}"
+    return f"~ {fit['exponential']['growth']:.3f}^n"
+
+def report(fits, predict_at=(), time_budget=None, memory_budget_mb=None):
+    for method, f in fits.items():
+        print(f"{method:22s} time {_describe(f['time'])}"
+              f"  (fitted on n={f['time']['qubit_range'][0]}..{f['time']['qubit_range'][1]})")
+        for n in predict_at:
+            t = float(predict(f['time'], n))
+            mem = predict_memory_mb(method, fits, n)
+            extra = f", {mem:.4g} MB" if mem is not None else ''
+            print(f"    n={n}: {t:.4g}s{extra}")
+        if time_budget is not None:
+            print(f"    max qubits within {time_budget}s: {max_feasible_qubits(f['time'], time_budget)}")
+        if memory_budget_mb is not None:
+            print(f"    max qubits within {memory_budget_mb} MB: "
+                  f"{max_feasible_memory_qubits(method, fits, memory_budget_mb)}")
+
+    if 'statevector' in fits:
+        for other in fits:
+            if other == 'statevector':
+                continue
+            for n, direction in crossovers(fits['statevector']['time'], fits[other]['time']):
+                print(f"statevector becomes {direction} than {other} at n={n}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit scaling laws to a benchmark.py baseline")
+    parser.add_argument('baseline')
+    parser.add_argument('--predict', type=int, nargs='*', default=[32, 40, 50, 100, 1000])
+    parser.add_argument('--time-budget', type=float, default=3600.0)
+    parser.add_argument('--memory-budget-mb', type=float, default=32768.0)
+    parser.add_argument('--min-qubits', type=int, default=MIN_QUBITS)
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    fits = fit_all(series_from_baseline(baseline), args.min_qubits)
+    report(fits, args.predict, args.time_budget, args.memory_budget_mb)
@@ -0,0 +1,323 @@
+from qiskit.quantum_info import SparsePauliOp
+import numpy as np
+import itertools
+import math
+
+# Statevector simulation in a compressed basis instead of all 2^n amplitudes.
+#
+# SectorBasis / SubspaceOperator / SubspaceUCC: the UCCSD states of qch2.py
+# conserve the alpha and beta particle numbers, so they live in the sector
+# of determinants with num_particles = (n_alpha, n_beta) electrons in
+# num_spatial_orbitals orbitals, C(n, n_alpha) * C(n, n_beta) amplitudes
+# instead of 4^n. A determinant is an occupation bitstring in Jordan-Wigner
+# order (bit p = spin orbital p, alpha orbitals first), which is also its
+# qubit index under qiskit-nature's JordanWignerMapper.
+#   - Operators (a FermionicOp or a JW-mapped SparsePauliOp) are restricted
+#     to the sector term by term: each term maps determinant j to one
+#     determinant j' with a phase, and only pairs with both ends in the
+#     sector are kept, giving a sparse dim x dim matrix.
+#   - Every UCC excitation exp(theta (T - T^dagger)), T = a+_occ a-_unocc as
+#     built by qiskit-nature's UCC, is a set of disjoint Givens rotations
+#     between determinant pairs, applied directly on the sector amplitudes.
+#   - SubspaceEnergy evaluates <psi(theta)|H|psi(theta)> and its adjoint
+#     gradient (as compiled_ansatz.CompiledEnergy does on the full space),
+#     so memory and time scale with the sector dimension, not 2^n.
+#
+# SparseState: a sorted (index, amplitude) map for circuits whose support
+# stays small (GHZ-like and product-like states), with gates and Pauli
+# expectations applied on the support only.
+
+# Amplitudes smaller than this are dropped from a SparseState
+SPARSE_TOLERANCE = 1e-12
+
+_BIT_COUNTS = np.array([bin(i).count('1') for i in range(256)], dtype=np.int64)
+
+def _popcount(values):
+    values = np.ascontiguousarray(values, dtype=np.int64)
+    return _BIT_COUNTS[values.view(np.uint8)].reshape(values.shape + (8,)).sum(axis=-1)
+
+# Positions of `targets` in the sorted `states` array, and which were found
+def _lookup(states, targets):
+    pos = np.minimum(np.searchsorted(states, targets), len(states) - 1)
+    return pos, states[pos] == targets
+
+# Apply a FermionicOp label ('+_0 -_2 ...', rightmost first) to determinants:
+# returns the resulting determinants, the fermionic signs and which inputs
+# were not annihilated
+def _apply_label(label, states):
+    out = np.array(states, dtype=np.int64)
+    sign = np.ones(len(out))
+    alive = np.ones(len(out), dtype=bool)
+    for action in reversed(label.split()):
+        kind, index = action.split('_')
+        index = int(index)
+        occupied = (out >> index) & 1
+        alive &= occupied == (1 if kind == '-' else 0)
+        sign *= 1 - 2 * (_popcount(out & ((1 << index) - 1)) & 1)
+        out ^= 1 << index
+    return out, sign, alive
+
+def _pauli_masks(pauli):
+    weights = 1 << np.arange(len(pauli.x), dtype=np.int64)
+    return int(pauli.x @ weights), int(pauli.z @ weights), (-1j) ** (int(np.sum(pauli.x & pauli.z)) % 4)
+
+
+class SectorBasis:
+    def __init__(self, num_spatial_orbitals, num_particles):
+        self.num_spatial_orbitals = n = num_spatial_orbitals
+        self.num_particles = tuple(num_particles)
+        self.num_qubits = 2 * n
+        if self.num_qubits > 62:
+            raise ValueError(f"{self.num_qubits} spin orbitals do not fit in an int64 determinant")
+        n_alpha, n_beta = self.num_particles
+        alpha = [sum(1 << p for p in occ) for occ in itertools.combinations(range(n), n_alpha)]
+        beta = [sum(1 << (n + p) for p in occ) for occ in itertools.combinations(range(n), n_beta)]
+        self.states = np.sort(np.add.outer(np.array(alpha, dtype=np.int64),
+                                           np.array(beta, dtype=np.int64)).ravel())
+        self.dim = len(self.states)
+
+    # Lowest orbitals filled in each spin block, as qiskit-nature's HartreeFock
+    @property
+    def hartree_fock(self):
+        n_alpha, n_beta = self.num_particles
+        return ((1 << n_alpha) - 1) | (((1 << n_beta) - 1) << self.num_spatial_orbitals)
+
+    def index(self, determinants):
+        pos, found = _lookup(self.states, np.asarray(determinants, dtype=np.int64))
+        if not np.all(found):
+            raise ValueError("determinant outside the particle-number sector")
+        return pos
+
+    # Dense 2^n statevector (Qiskit qubit order) of sector amplitudes
+    def to_dense(self, amplitudes):
+        state = np.zeros(2 ** self.num_qubits, dtype=complex)
+        state[self.states] = amplitudes
+        return state
+
+    def from_dense(self, state):
+        return np.asarray(state)[..., self.states]
+
+    def compression(self):
+        return 2 ** self.num_qubits / self.dim
+
+
+class SubspaceOperator:
+    def __init__(self, matrix, basis):
+        self.matrix = matrix.tocsr()
+        self.basis = basis
+
+    @classmethod
+    def _from_entries(cls, rows, cols, values, basis):
+        from scipy.sparse import coo_matrix
+        rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+        cols = np.concatenate(cols) if cols else np.zeros(0, dtype=np.int64)
+        values = np.concatenate(values) if values else np.zeros(0, dtype=complex)
+        return cls(coo_matrix((values, (rows, cols)), shape=(basis.dim, basis.dim)), basis)
+
+    # Restriction of a FermionicOp (e.g. problem.hamiltonian.second_q_op())
+    @classmethod
+    def from_fermionic(cls, op, basis):
+        rows, cols, values = [], [], []
+        for label, coeff in op.items():
+            if not label:
+                rows.append(np.arange(basis.dim))
+                cols.append(np.arange(basis.dim))
+                values.append(np.full(basis.dim, complex(coeff)))
+                continue
+            targets, sign, alive = _apply_label(label, basis.states)
+            pos, found = _lookup(basis.states, targets)
+            keep = alive & found
+            rows.append(pos[keep])
+            cols.append(np.flatnonzero(keep))
+            values.append(complex(coeff) * sign[keep])
+        return cls._from_entries(rows, cols, values, basis)
+
+    # Restriction of a Jordan-Wigner-mapped SparsePauliOp: P|j> = phase |j ^ x>
+    # with phase = factor * (-1)^(z . (j ^ x))
+    @classmethod
+    def from_pauli(cls, op, basis):
+        if not isinstance(op, SparsePauliOp):
+            op = SparsePauliOp(op)
+        if op.num_qubits != basis.num_qubits:
+            raise ValueError(f"operator acts on {op.num_qubits} qubits, the sector on {basis.num_qubits}")
+        rows, cols, values = [], [], []
+        for pauli, coeff in zip(op.paulis, op.coeffs):
+            x_mask, z_mask, factor = _pauli_masks(pauli)
+            targets = basis.states ^ x_mask
+            pos, found = _lookup(basis.states, targets)
+            signs = 1 - 2 * (_popcount(targets & z_mask) & 1)
+            rows.append(pos[found])
+            cols.append(np.flatnonzero(found))
+            values.append(coeff * factor * signs[found])
+        return cls._from_entries(rows, cols, values, basis)
+
+    # H applied to a (dim,) or (batch, dim) array of sector amplitudes
+    def apply(self, states):
+        return (self.matrix @ np.asarray(states).T).T
+
+    def expectation(self, states):
+        states = np.asarray(states)
+        values = np.einsum('...i,...i->...', states.conj(), self.apply(states)).real
+        return values
+
+    # Lowest eigenvalue in the sector (exact reference for VQE)
+    def ground_energy(self):
+        if self.basis.dim <= 256:
+            return float(np.linalg.eigvalsh(self.matrix.toarray())[0])
+        from scipy.sparse.linalg import eigsh
+        return float(eigsh(self.matrix, k=1, which='SA')[0][0])
+
+
+# qiskit-nature UCC(HartreeFock) with the given excitation list, applied as
+# Givens rotations on the sector amplitudes; parameters in excitation order
+class SubspaceUCC:
+    def __init__(self, basis, excitations):
+        self.basis = basis
+        self.num_parameters = len(excitations)
+        self.rotations = []
+        for occ, unocc in excitations:
+            label = ' '.join([f"+_{p}" for p in occ] + [f"-_{p}" for p in unocc])
+            # T |src> = sign |dst>, and G = T - T^dagger rotates each pair
+            targets, sign, alive = _apply_label(label, basis.states)
+            pos, found = _lookup(basis.states, targets)
+            keep = alive & found
+            self.rotations.append((np.flatnonzero(keep), pos[keep], sign[keep]))
+        self._reference = basis.index([basis.hartree_fock])[0]
+
+    def _rotate(self, state, rotation, theta):
+        src, dst, sign = rotation
+        c = np.cos(theta)[:, None]
+        s = (np.sin(theta)[:, None]) * sign
+        a, b = state[:, src], state[:, dst]
+        state[:, src] = c * a - s * b
+        state[:, dst] = c * b + s * a
+
+    # Sector amplitudes for a (batch, num_parameters) array
+    def statevectors(self, params):
+        params = np.atleast_2d(np.asarray(params, dtype=float))
+        state = np.zeros((params.shape[0], self.basis.dim), dtype=complex)
+        state[:, self._reference] = 1
+        for k, rotation in enumerate(self.rotations):
+            self._rotate(state, rotation, params[:, k])
+        return state
+
+    # G psi for the generator of rotation k
+    def _generator(self, state, rotation):
+        src, dst, sign = rotation
+        out = np.zeros_like(state)
+        out[:, dst] = sign * state[:, src]
+        out[:, src] = -sign * state[:, dst]
+        return out
+
+    # Adjoint differentiation as in compiled_ansatz: dU_k/dtheta_k = G_k U_k,
+    # so each parameter's derivative is 2 Re <lam|G_k|phi> on the way back
+    def energy_and_gradient(self, params, hamiltonian):
+        params = np.atleast_2d(np.asarray(params, dtype=float))
+        phi = self.statevectors(params)
+        lam = hamiltonian.apply(phi)
+        energies = np.einsum('bi,bi->b', phi.conj(), lam).real
+        gradient = np.zeros(params.shape)
+        for k in reversed(range(self.num_parameters)):
+            rotation = self.rotations[k]
+            overlap = np.einsum('bi,bi->b', lam.conj(), self._generator(phi, rotation))
+            gradient[:, k] = 2 * overlap.real
+            self._rotate(phi, rotation, -params[:, k])
+            self._rotate(lam, rotation, -params[:, k])
+        return energies, gradient
+
+
+# <psi(theta)|H|psi(theta)> for UCCSD on an ElectronicStructureProblem,
+# electronic energy only (add total_shift for the total energy); same call
+# and gradient interface as compiled_ansatz.CompiledEnergy
+class SubspaceEnergy:
+    def __init__(self, problem, excitations=None):
+        if excitations is None:
+            from compile_cache import excitation_list
+            excitations = excitation_list(problem.num_spatial_orbitals, problem.num_particles)
+        self.basis = SectorBasis(problem.num_spatial_orbitals, problem.num_particles)
+        self.hamiltonian = SubspaceOperator.from_fermionic(problem.hamiltonian.second_q_op(), self.basis)
+        self.ansatz = SubspaceUCC(self.basis, excitations)
+        self.num_parameters = self.ansatz.num_parameters
+        self.total_shift = float(sum(np.real(v) for v in problem.hamiltonian.constants.values()))
+
+    def __call__(self, params):
+        params = np.asarray(params, dtype=float)
+        energies = self.hamiltonian.expectation(self.ansatz.statevectors(params))
+        return float(energies[0]) if params.ndim == 1 else energies
+
+    def gradient(self, params):
+        params = np.asarray(params, dtype=float)
+        _, gradient = self.ansatz.energy_and_gradient(params, self.hamiltonian)
+        return gradient[0] if params.ndim == 1 else gradient
+
+
+# Sorted basis indices and their amplitudes; only the support is stored
+class SparseState:
+    def __init__(self, num_qubits, indices=None, amplitudes=None):
+        if num_qubits > 62:
+            raise ValueError(f"{num_qubits} qubits do not fit in an int64 index")
+        self.num_qubits = num_qubits
+        if indices is None:
+            indices, amplitudes = [0], [1.0]
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.amplitudes = np.asarray(amplitudes, dtype=complex)
+
+    @classmethod
+    def from_circuit(cls, qc, tolerance=SPARSE_TOLERANCE):
+        state = cls(qc.num_qubits)
+        for inst in qc.data:
+            if inst.operation.name == 'barrier':
+                continue
+            qubits = [qc.find_bit(q).index for q in inst.qubits]
+            state.apply(np.asarray(inst.operation.to_matrix()), qubits, tolerance)
+        return state
+
+    # Apply a 2^k x 2^k gate on `qubits` (first qubit = lowest matrix bit)
+    def apply(self, matrix, qubits, tolerance=SPARSE_TOLERANCE):
+        k = len(qubits)
+        local = np.zeros(len(self.indices), dtype=np.int64)
+        base = self.indices.copy()
+        for i, q in enumerate(qubits):
+            local |= ((self.indices >> q) & 1) << i
+            base &= ~(1 << q)
+        outputs = np.arange(2 ** k)
+        scatter = np.zeros(2 ** k, dtype=np.int64)
+        for i, q in enumerate(qubits):
+            scatter |= ((outputs >> i) & 1) << q
+        indices = (base[None, :] | scatter[:, None]).ravel()
+        amplitudes = (matrix[:, local] * self.amplitudes[None, :]).ravel()
+        indices, inverse = np.unique(indices, return_inverse=True)
+        summed = np.zeros(len(indices), dtype=complex)
+        np.add.at(summed, inverse, amplitudes)
+        keep = np.abs(summed) > tolerance
+        self.indices, self.amplitudes = indices[keep], summed[keep]
+        return self
+
+    def __len__(self):
+        return len(self.indices)
+
+    def expectation_value(self, op):
+        if not isinstance(op, SparsePauliOp):
+            op = SparsePauliOp(op)
+        value = 0j
+        for pauli, coeff in zip(op.paulis, op.coeffs):
+            x_mask, z_mask, factor = _pauli_masks(pauli)
+            pos, found = _lookup(self.indices, self.indices ^ x_mask)
+            # <psi|P|psi> = sum_j conj(psi[j]) factor (-1)^(z . j) psi[j ^ x]
+            signs = 1 - 2 * (_popcount(self.indices[found] & z_mask) & 1)
+            value += coeff * factor * np.sum(self.amplitudes[found].conj() * signs * self.amplitudes[pos[found]])
+        return value
+
+    def probabilities_dict(self):
+        probabilities = np.abs(self.amplitudes) ** 2
+        return {format(int(i), f'0{self.num_qubits}b'): float(p) for i, p in zip(self.indices, probabilities)}
+
+    def to_dense(self):
+        state = np.zeros(2 ** self.num_qubits, dtype=complex)
+        state[self.indices] = self.amplitudes
+        return state
+
+# Sector dimension vs full statevector size for a chemistry problem
+def sector_size(num_spatial_orbitals, num_particles):
+    n_alpha, n_beta = num_particles
+    return math.comb(num_spatial_orbitals, n_alpha) * math.comb(num_spatial_orbitals, n_beta)
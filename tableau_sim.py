@@ -0,0 +1,190 @@
+import numpy as np
+import time
+
+from counts import Counts
+
+# Pure-NumPy Aaronson-Gottesman stabilizer simulator for the Clifford circuits
+# in kg.py/kg1.py (h, s, cx, measure_all). Only NumPy is required, so it runs
+# where the compiled qiskit_aer wheel is not available.
+#
+# The tableau keeps 2n rows (n destabilizers followed by n stabilizers); the X
+# and Z halves of every row are bit-packed into uint64 words, so the whole
+# tableau takes 2 * 2n * ceil(n/64) words, i.e. O(n^2/64) memory.
+
+WORD_BITS = 64
+
+def _num_words(num_qubits):
+    return (num_qubits + WORD_BITS - 1) // WORD_BITS
+
+if hasattr(np, 'bitwise_count'):
+    def _popcount(words):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+else:
+    _BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.int64)
+
+    def _popcount(words):
+        as_bytes = np.ascontiguousarray(words).view(np.uint8)
+        return _BYTE_POPCOUNT[as_bytes].sum(axis=-1)
+
+# Sign exponent (power of i) picked up when multiplying the Pauli rows
+# (x1, z1) * (x2, z2) qubit by qubit, following the g() function of the
+# Aaronson-Gottesman paper; evaluated on packed words for many rows at once.
+def _product_phase(x1, z1, x2, z2):
+    plus = (x1 & z1 & ~x2 & z2) | (x1 & ~z1 & x2 & z2) | (~x1 & z1 & x2 & ~z2)
+    minus = (x1 & z1 & x2 & ~z2) | (x1 & ~z1 & ~x2 & z2) | (~x1 & z1 & x2 & z2)
+    return _popcount(plus) - _popcount(minus)
+
+# Multiply row `src` into every row selected by `targets` (rowsum in the paper)
+def _rowsum(x, z, r, targets, src):
+    if not targets.any():
+        return
+    phase = 2 * r[targets].astype(np.int64) + 2 * int(r[src])
+    phase += _product_phase(x[src], z[src], x[targets], z[targets])
+    r[targets] = (phase % 4) // 2
+    x[targets] ^= x[src]
+    z[targets] ^= z[src]
+
+def _column(rows, qubit):
+    return ((rows[:, qubit // WORD_BITS] >> np.uint64(qubit % WORD_BITS)) & np.uint64(1)).astype(bool)
+
+# Reduce the rows to echelon form on the given half (x or z), starting at
+# `first_row`; returns the (row, qubit) pivots that were found.
+def _eliminate(x, z, r, half, first_row, num_qubits):
+    pivots = []
+    row = first_row
+    for qubit in range(num_qubits):
+        if row == len(r):
+            break
+        col = _column(half, qubit)
+        candidates = np.flatnonzero(col[row:])
+        if len(candidates) == 0:
+            continue
+        p = row + candidates[0]
+        if p != row:
+            for a in (x, z, r):
+                a[[row, p]] = a[[p, row]]
+            col[[row, p]] = col[[p, row]]
+        col[row] = False
+        _rowsum(x, z, r, col, row)
+        pivots.append((row, qubit))
+        row += 1
+    return pivots
+
+def _unpack_bits(packed, num_qubits):
+    as_bytes = np.ascontiguousarray(packed).view(np.uint8)
+    return np.unpackbits(as_bytes, axis=-1, bitorder='little')[..., :num_qubits].astype(bool)
+
+
+class StabilizerTableau:
+    # Start in |0...0>: destabilizer i is X_i, stabilizer i is Z_i
+    def __init__(self, num_qubits):
+        self.num_qubits = num_qubits
+        words = _num_words(num_qubits)
+        self.x = np.zeros((2 * num_qubits, words), dtype=np.uint64)
+        self.z = np.zeros((2 * num_qubits, words), dtype=np.uint64)
+        self.r = np.zeros(2 * num_qubits, dtype=np.uint8)
+        for q in range(num_qubits):
+            bit = np.uint64(1) << np.uint64(q % WORD_BITS)
+            self.x[q, q // WORD_BITS] = bit
+            self.z[num_qubits + q, q // WORD_BITS] = bit
+
+    @property
+    def nbytes(self):
+        return self.x.nbytes + self.z.nbytes + self.r.nbytes
+
+    def _bits(self, qubit):
+        return qubit // WORD_BITS, np.uint64(qubit % WORD_BITS)
+
+    def h(self, a):
+        w, b = self._bits(a)
+        xa = (self.x[:, w] >> b) & np.uint64(1)
+        za = (self.z[:, w] >> b) & np.uint64(1)
+        self.r ^= (xa & za).astype(np.uint8)
+        swap = (xa ^ za) << b
+        self.x[:, w] ^= swap
+        self.z[:, w] ^= swap
+
+    def s(self, a):
+        w, b = self._bits(a)
+        xa = (self.x[:, w] >> b) & np.uint64(1)
+        za = (self.z[:, w] >> b) & np.uint64(1)
+        self.r ^= (xa & za).astype(np.uint8)
+        self.z[:, w] ^= xa << b
+
+    def cx(self, a, t):
+        wa, ba = self._bits(a)
+        wt, bt = self._bits(t)
+        xa = (self.x[:, wa] >> ba) & np.uint64(1)
+        za = (self.z[:, wa] >> ba) & np.uint64(1)
+        xt = (self.x[:, wt] >> bt) & np.uint64(1)
+        zt = (self.z[:, wt] >> bt) & np.uint64(1)
+        self.r ^= (xa & zt & (xt ^ za ^ np.uint64(1))).astype(np.uint8)
+        self.x[:, wt] ^= xa << bt
+        self.z[:, wa] ^= zt << ba
+
+    # Sample `shots` full Z-basis measurements without replaying the circuit.
+    # The outcome distribution of a stabilizer state is uniform over the
+    # affine space x0 + span(X parts of the stabilizers), so one Gaussian
+    # elimination gives the generators and every shot is a random XOR of them.
+    # Returns a (shots, num_qubits) bool array, column q is qubit q.
+    def sample_measurements(self, shots, rng=None):
+        rng = np.random.default_rng(rng)
+        n = self.num_qubits
+        x = self.x[n:].copy()
+        z = self.z[n:].copy()
+        r = self.r[n:].copy()
+
+        # Stabilizers with an X part span the random directions; the rest are
+        # +-Z strings that fix the parities of the outcome
+        k = len(_eliminate(x, z, r, x, 0, n))
+        offset = np.zeros(x.shape[1], dtype=np.uint64)
+        for row, qubit in _eliminate(x, z, r, z, k, n):
+            if r[row]:
+                w, b = self._bits(qubit)
+                offset[w] |= np.uint64(1) << b
+        # In reduced echelon form each Z row has a single pivot, so setting the
+        # free qubits to 0 gives x0[pivot] = sign of the row
+
+        samples = np.tile(offset, (shots, 1))
+        choices = rng.integers(0, 2, size=(shots, k), dtype=np.uint8).astype(bool)
+        for j in range(k):
+            samples[choices[:, j]] ^= x[j]
+        return _unpack_bits(samples, n)
+
+
+# Supported gate names; barriers are ignored and measurements are collected
+# so they can be sampled together at the end of the circuit
+GATES = {'h': StabilizerTableau.h, 's': StabilizerTableau.s, 'cx': StabilizerTableau.cx}
+
+# Run a Clifford QuantumCircuit (measurements at the end) and return its
+# counts as a counts.Counts, like kg1.simulate_circuit. Only qc.data and
+# qc.find_bit are used, so qiskit_aer is not needed.
+def run_circuit(qc, shots=1024, seed=None):
+    tableau = StabilizerTableau(qc.num_qubits)
+    measured = []
+    for inst in qc.data:
+        name = inst.operation.name
+        qubits = [qc.find_bit(q).index for q in inst.qubits]
+        if name == 'barrier':
+            continue
+        if name == 'measure':
+            measured.append((qubits[0], qc.find_bit(inst.clbits[0]).index))
+            continue
+        if measured:
+            raise ValueError("tableau_sim only supports measurements at the end of the circuit")
+        if name not in GATES:
+            raise ValueError(f"Gate '{name}' is not supported by tableau_sim")
+        GATES[name](tableau, *qubits)
+
+    outcomes = tableau.sample_measurements(shots, rng=seed)
+    clbits = np.zeros((shots, qc.num_clbits), dtype=bool)
+    for qubit, clbit in measured:
+        clbits[:, clbit] = outcomes[:, qubit]
+    return Counts.from_bits(clbits, [creg.size for creg in qc.cregs])
+
+# Same (counts, elapsed) interface as kg1.simulate_circuit
+def simulate_circuit(qc, shots=1024, seed=None):
+    start_time = time.perf_counter()
+    counts = run_circuit(qc, shots=shots, seed=seed)
+    elapsed = time.perf_counter() - start_time
+    return counts, elapsed
@@ -0,0 +1,32 @@
+from qiskit import QuantumCircuit
+from qiskit.circuit.library import EfficientSU2, PauliEvolutionGate
+from qiskit.quantum_info import SparsePauliOp
+
+from transpile_cache import cache_key, circuit_key
+
+# Regression tests: circuits that differ only inside an instruction (its
+# definition or evolution operator) must not share a cache entry
+
+def _evolution(label, time=0.3):
+    qc = QuantumCircuit(2)
+    qc.append(PauliEvolutionGate(SparsePauliOp(label), time), [0, 1])
+    return qc
+
+def _su2(entanglement):
+    qc = QuantumCircuit(3)
+    qc.append(EfficientSU2(3, entanglement=entanglement, reps=1), [0, 1, 2])
+    return qc
+
+def test_pauli_evolution_operators_differ():
+    assert circuit_key(_evolution('XX')) != circuit_key(_evolution('ZZ'))
+    assert cache_key(_evolution('XX'), optimization_level=1) != cache_key(_evolution('ZZ'), optimization_level=1)
+
+def test_pauli_evolution_same_operator_matches():
+    assert cache_key(_evolution('XX')) == cache_key(_evolution('XX'))
+
+def test_library_block_entanglement_differs():
+    assert circuit_key(_su2('linear')) != circuit_key(_su2('full'))
+    assert cache_key(_su2('linear'), optimization_level=1) != cache_key(_su2('full'), optimization_level=1)
+
+def test_rebuilt_library_block_matches():
+    assert cache_key(_su2('linear')) == cache_key(_su2('linear'))
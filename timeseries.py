@@ -0,0 +1,76 @@
+import numpy as np
+import json
+import os
+import uuid
+
+# Append-only columnar store for long time series, e.g. the (t, observables)
+# rows streamed by TrotterEngine.stream. Rows are buffered in a fixed
+# (chunk_rows, num_columns) float array and every full buffer is written as
+# the next numbered .npy chunk, so memory stays flat however long the run is.
+# Chunks are written under a temporary name and renamed into place, so
+# read_series can be called from another process while the run is still
+# going and only ever sees complete chunks. A new writer starts the series
+# over unless append=True.
+
+CHUNK_ROWS = 4096
+
+class SeriesWriter:
+    def __init__(self, directory, columns, chunk_rows=CHUNK_ROWS, append=False):
+        self.directory = directory
+        self.columns = list(columns)
+        os.makedirs(directory, exist_ok=True)
+        if not append:
+            for name in _chunk_files(directory):
+                os.remove(os.path.join(directory, name))
+        with open(os.path.join(directory, 'columns.json'), 'w') as f:
+            json.dump(self.columns, f)
+        self._chunk = len(_chunk_files(directory))
+        self._buffer = np.empty((chunk_rows, len(self.columns)))
+        self._rows = 0
+
+    def append(self, row):
+        self._buffer[self._rows] = row
+        self._rows += 1
+        if self._rows == len(self._buffer):
+            self.flush()
+
+    # Write the buffered rows as a chunk now, even if it is not full
+    def flush(self):
+        if not self._rows:
+            return
+        tmp = os.path.join(self.directory, f".{uuid.uuid4().hex}.npy")
+        np.save(tmp, self._buffer[:self._rows])
+        os.replace(tmp, os.path.join(self.directory, f"{self._chunk:06d}.npy"))
+        self._chunk += 1
+        self._rows = 0
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _chunk_files(directory):
+    return sorted(name for name in os.listdir(directory)
+                  if name.endswith('.npy') and not name.startswith('.'))
+
+# {column: array} of every chunk written so far
+def read_series(directory):
+    with open(os.path.join(directory, 'columns.json')) as f:
+        columns = json.load(f)
+    chunks = [np.load(os.path.join(directory, name)) for name in _chunk_files(directory)]
+    data = np.concatenate(chunks) if chunks else np.empty((0, len(columns)))
+    return {name: data[:, i] for i, name in enumerate(columns)}
+
+# Drain a (t, values) generator into `directory`; flush_every rows are
+# pushed to disk early so the run can be watched live
+def record(stream, directory, names, chunk_rows=CHUNK_ROWS, flush_every=None, append=False):
+    with SeriesWriter(directory, ['t'] + list(names), chunk_rows, append) as writer:
+        for i, (t, values) in enumerate(stream, start=1):
+            writer.append(np.concatenate([[t], values]))
+            if flush_every and i % flush_every == 0:
+                writer.flush()
+    return directory
@@ -1,9 +1,14 @@
 from qiskit import QuantumCircuit
-from qiskit.quantum_info import Statevector
+from qiskit.quantum_info import SparsePauliOp, Statevector
 import numpy as np
-import matplotlib.pyplot as mp
 
-# Trotterization function
+import render
+from trotter import TrotterEngine
+
+# The rz(-2dt) / rx(-2dt) pair of a step is exp(-i H dt) for H = -(Z_0 + X_1)
+H = SparsePauliOp.from_list([("IZ", -1.0), ("XI", -1.0)])
+
+# Trotterization function (circuit form, used for the drawing)
 def apply_trotter_step(qc, t, N):
     dt = t / N
     for _ in range(N):
@@ -17,10 +22,13 @@ qc = QuantumCircuit(2)
 apply_trotter_step(qc, t=1, N=10)
 
 # Visualize the circuit
-qc.draw('mpl')  # Will show circuit if running in notebook; can skip or use .draw('text') in terminal
+render.circuit('tm_trotter_circuit', qc)  # rendered in the background, see render.py
 
-# Simulate using Statevector
-statevector = Statevector.from_instruction(qc)
+# Simulate with the fused NumPy Trotter engine instead of gate by gate
+engine = TrotterEngine(H)
+statevector = Statevector(engine.evolve(t=1, steps=10))
 
 # Print the final statevector
 print(statevector)
+print(f"Trotter error vs exact evolution: {engine.trotter_error(t=1, steps=10)['norm']:.2e}")
+render.finish()
@@ -0,0 +1,221 @@
+from qiskit import qpy, transpile
+import numpy as np
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import uuid
+
+# transpile() with memoization. Circuits are keyed by a canonical structural
+# hash (registers, every instruction's name / qubits / clbits / parameters,
+# recursively through control-flow blocks and non-standard gate definitions,
+# plus the operator of Pauli evolutions) together with everything that
+# changes the transpiler's output: backend target (including every
+# instruction's error and duration), coupling map, basis
+# gates, optimization level, seed and any other transpile() keyword. Hits
+# come from an in-process LRU or, unless cache_dir is None, from QPY files
+# on disk.
+#
+# Parametrized circuits are transpiled once with their parameters unbound;
+# parameter values are bound to the cached result after lookup, so
+# sweeping parameter values never re-runs the transpiler.
+
+CACHE_DIR = os.environ.get(
+    'TRANSPILE_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'quantum-computing', 'transpile')
+)
+MAX_CACHE_BYTES = 256 * 1024 ** 2
+MAX_MEMORY_ENTRIES = 256
+# Bump when the key or on-disk layout changes so stale entries are never read
+FORMAT_VERSION = 3
+
+STATS = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+
+_memory = OrderedDict()
+
+def _param(value):
+    if hasattr(value, 'parameters'):
+        return 'expr:' + str(value)
+    if hasattr(value, 'num_qubits'):  # nested circuit, e.g. a control-flow block
+        return circuit_key(value)
+    if isinstance(value, np.ndarray):  # e.g. a UnitaryGate matrix; repr() summarizes and rounds
+        array = np.ascontiguousarray(value)
+        digest = hashlib.sha256(array.tobytes()).hexdigest()
+        return f"array:{array.dtype.str}:{list(array.shape)}:{digest}"
+    try:
+        return repr(complex(value))
+    except (TypeError, ValueError):
+        return repr(value)
+
+# Settings of an evolution synthesis object (LieTrotter, SuzukiTrotter, ...)
+# that are plain values; callables and objects would only add addresses
+def _synthesis_key(synthesis):
+    settings = {name: value for name, value in sorted(vars(synthesis).items())
+                if isinstance(value, (bool, int, float, str, type(None)))}
+    return [type(synthesis).__name__, settings]
+
+# What an instruction does beyond its name and params: a PauliEvolutionGate
+# is its operator (labels, coefficients) and synthesis settings; any other
+# non-standard gate (library blocks such as EfficientSU2, custom gates) is
+# its definition, hashed recursively. Standard gates, control flow (keyed by
+# their blocks) and matrix-defined gates (keyed by the matrix) add nothing.
+def _operation_key(op):
+    if op.name == 'PauliEvolution':
+        operators = op.operator if isinstance(op.operator, list) else [op.operator]
+        return {'operator': [[[label, _param(c)] for label, c in operator.to_list()] for operator in operators],
+                'synthesis': _synthesis_key(op.synthesis)}
+    standard = _standard_gates().get(op.name)
+    if (standard is not None and type(standard) is type(op)) or op.name == 'barrier':
+        return None
+    if getattr(op, 'blocks', ()) or any(isinstance(p, np.ndarray) for p in op.params):
+        return None
+    definition = getattr(op, 'definition', None)
+    return circuit_key(definition) if definition is not None else None
+
+_standard = None
+
+def _standard_gates():
+    global _standard
+    if _standard is None:
+        from qiskit.circuit.library import get_standard_gate_name_mapping
+        _standard = get_standard_gate_name_mapping()
+    return _standard
+
+# Parameters enter by name, so circuits rebuilt with fresh Parameter objects
+# of the same names share an entry
+def circuit_key(circuit):
+    instructions = []
+    for inst in circuit.data:
+        op = inst.operation
+        instructions.append([
+            op.name,
+            [circuit.find_bit(q).index for q in inst.qubits],
+            [circuit.find_bit(c).index for c in inst.clbits],
+            [_param(p) for p in op.params],
+            [_param(b) for b in getattr(op, 'blocks', ())],
+            _operation_key(op),
+        ])
+    return {
+        'qregs': [[r.name, r.size] for r in circuit.qregs],
+        'cregs': [[r.name, r.size] for r in circuit.cregs],
+        'num_qubits': circuit.num_qubits,
+        'num_clbits': circuit.num_clbits,
+        'global_phase': _param(circuit.global_phase),
+        'instructions': instructions,
+    }
+
+# Digest of every instruction's error and duration on every qargs; both
+# steer layout and routing at optimization levels 2 and 3
+def _properties_digest(target):
+    rows = []
+    for name in sorted(target.operation_names):
+        for qargs, props in target[name].items():
+            rows.append([name, list(qargs) if qargs is not None else None,
+                         None if props is None else props.error,
+                         None if props is None else props.duration])
+    rows.sort(key=repr)
+    return hashlib.sha256(json.dumps(rows).encode()).hexdigest()
+
+def _target_key(backend, kwargs):
+    key = {name: repr(value) for name, value in sorted(kwargs.items()) if name != 'coupling_map'}
+    coupling = kwargs.get('coupling_map')
+    if coupling is not None:
+        key['coupling_map'] = sorted(map(list, coupling.get_edges() if hasattr(coupling, 'get_edges')
+                                          else coupling))
+    if backend is not None:
+        target = backend.target
+        target_coupling = target.build_coupling_map()
+        key['backend'] = {
+            'name': backend.name,
+            'num_qubits': target.num_qubits,
+            'operations': sorted(target.operation_names),
+            'coupling_map': sorted(map(list, target_coupling.get_edges()))
+            if target_coupling is not None else None,
+            'properties': _properties_digest(target),
+        }
+    return key
+
+def cache_key(circuit, backend=None, **kwargs):
+    import qiskit
+    inputs = {
+        'circuit': circuit_key(circuit),
+        'target': _target_key(backend, kwargs),
+        'format': FORMAT_VERSION,
+        'qiskit': qiskit.__version__,
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+def _remember(key, value):
+    _memory[key] = value
+    _memory.move_to_end(key)
+    while len(_memory) > MAX_MEMORY_ENTRIES:
+        _memory.popitem(last=False)
+
+def clear_memory():
+    _memory.clear()
+
+def cache_info():
+    return dict(STATS, memory_entries=len(_memory))
+
+def _evict(cache_dir, max_bytes):
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith('.qpy') and not name.startswith('.'):
+            path = os.path.join(cache_dir, name)
+            entries.append((os.path.getmtime(path), path, os.path.getsize(path)))
+    total = sum(size for _, _, size in entries)
+    for _, path, size in sorted(entries):
+        if total <= max_bytes:
+            break
+        os.remove(path)
+        total -= size
+
+def _load(key, cache_dir):
+    path = os.path.join(cache_dir, f"{key}.qpy")
+    if not os.path.exists(path):
+        return None
+    os.utime(path)
+    with open(path, 'rb') as f:
+        return qpy.load(f)[0]
+
+def _store(key, circuit, cache_dir, max_bytes):
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = os.path.join(cache_dir, f".{key}.{uuid.uuid4().hex}")
+    with open(tmp, 'wb') as f:
+        qpy.dump(circuit, f)
+    os.replace(tmp, os.path.join(cache_dir, f"{key}.qpy"))
+    _evict(cache_dir, max_bytes)
+
+# Drop-in for transpile(circuit, backend, **kwargs) on a single circuit.
+# parameter_values (a sequence in circuit.parameters order, or a dict) are
+# bound after the lookup; pass cache_dir=None to keep the cache in memory.
+def transpile_cached(circuit, backend=None, parameter_values=None, cache_dir=CACHE_DIR,
+                     max_bytes=MAX_CACHE_BYTES, **kwargs):
+    key = cache_key(circuit, backend, **kwargs)
+    compiled = _memory.get(key)
+    if compiled is not None:
+        STATS['hits'] += 1
+        _memory.move_to_end(key)
+    else:
+        compiled = _load(key, cache_dir) if cache_dir else None
+        if compiled is not None:
+            STATS['disk_hits'] += 1
+        else:
+            STATS['misses'] += 1
+            compiled = transpile(circuit, backend, **kwargs)
+            if cache_dir:
+                _store(key, compiled, cache_dir, max_bytes)
+        _remember(key, compiled)
+
+    # The cached circuit carries the Parameter objects of whichever circuit
+    # filled the entry; match them to this circuit's by name
+    cached = {p.name: p for p in compiled.parameters}
+    if parameter_values is None:
+        mapping = {cached[p.name]: p for p in circuit.parameters
+                   if p.name in cached and cached[p.name] != p}
+    else:
+        if not isinstance(parameter_values, dict):
+            parameter_values = dict(zip(circuit.parameters, parameter_values))
+        mapping = {cached[p.name]: v for p, v in parameter_values.items() if p.name in cached}
+    if mapping:
+        return compiled.assign_parameters(mapping)
+    return compiled.copy()
@@ -0,0 +1,118 @@
+from qiskit.quantum_info import PauliList, Statevector
+from qiskit_nature.second_q.algorithms.excited_states_solvers import QEOM
+from qiskit_nature.second_q.mappers import TaperedQubitMapper
+import numpy as np
+
+from compiled_ansatz import PauliHamiltonian
+
+# Drop-in QEOM whose EOM matrices are evaluated directly on the ground-state
+# statevector instead of building every (double) commutator operator
+# symbolically and sending them through the estimator one by one.
+#
+# With A = E_m, B = H, C = E_n or E_n^dag, every matrix element is a sum of
+# <psi|XYZ|psi> products, and each of those is an overlap of two vectors
+# taken from a small set computed once per excitation operator:
+#   E psi, E^dag psi, H E psi, H E^dag psi, E H psi, E^dag H psi
+# The Pauli strings of all excitation operators are deduplicated and applied
+# to psi and H psi in a single vectorized pass; the excitation vectors are
+# then one (K x U) coefficient matrix product, and all K x K matrix elements
+# come out of a handful of Gram matrices. Cost is O(K) operator applications
+# instead of O(K^2) symbolic double commutators.
+#
+# Tapered mappers evaluate operators per symmetry sector and fall back to
+# the stock implementation.
+
+# Every Pauli string of a PauliList applied to every row of `states`:
+# result[u, s] = P_u states[s]. Qiskit's Pauli is (-i)^(z.x) Z^z X^x, so
+# (P psi)[j] = (-i)^(z.x) (-1)^(z.j) psi[j ^ x].
+def apply_paulis(paulis, states):
+    n = paulis.num_qubits
+    index = np.arange(2 ** n)
+    powers = 1 << np.arange(n)
+    x_masks = paulis.x.astype(np.int64) @ powers
+    bits = (index[:, None] >> np.arange(n)) & 1
+    signs = 1 - 2 * ((bits @ paulis.z.T.astype(np.int64)) % 2)
+    factors = (-1j) ** (np.sum(paulis.x & paulis.z, axis=1) % 4)
+    flipped = index[None, :] ^ x_masks[:, None]
+    return factors[:, None, None] * signs.T[:, None, :] * states[:, flipped].transpose(1, 0, 2)
+
+# Deduplicated Pauli strings of `ops` and the (len(ops), U) matrix of their
+# coefficients on them
+def pauli_basis(ops):
+    index, paulis, rows = {}, [], []
+    for op in ops:
+        row = {}
+        for pauli, coeff in zip(op.paulis, op.coeffs):
+            key = (pauli.x.tobytes(), pauli.z.tobytes())
+            if key not in index:
+                index[key] = len(paulis)
+                paulis.append(pauli)
+            row[index[key]] = row.get(index[key], 0) + coeff
+        rows.append(row)
+    coeffs = np.zeros((len(ops), len(paulis)), dtype=complex)
+    for k, row in enumerate(rows):
+        for u, c in row.items():
+            coeffs[k, u] = c
+    return PauliList(paulis), coeffs
+
+def _gram(bras, kets):
+    return bras.conj() @ kets.T
+
+# <psi|[[A, B], C]/2 + [A, [B, C]]/2|psi> for all pairs (A_m, C_n), as
+# QEOM's _double_commutator with sign=False. `left` / `right` hold the
+# vectors 'op' (X psi), 'dag' (X^dag psi), 'h_op' (H X psi),
+# 'op_h' (X H psi) and 'dag_h' (X^dag H psi) for every operator X.
+def double_commutators(left, right):
+    abc = _gram(left['dag'], right['h_op'])
+    cba = _gram(right['dag'], left['h_op']).T
+    bac = _gram(left['dag_h'], right['op'])
+    cab = _gram(right['dag'], left['op_h']).T
+    acb = _gram(left['dag'], right['op_h'])
+    bca = _gram(right['dag_h'], left['op']).T
+    return (2 * abc + 2 * cba - bac - cab - acb - bca) / 2
+
+# <psi|[A_m, C_n]|psi> for all pairs
+def commutators(left, right):
+    return _gram(left['dag'], right['op']) - _gram(right['dag'], left['op']).T
+
+
+class VectorizedQEOM(QEOM):
+    def _build_qeom_pseudoeigenvalue_problem(self, untap_operator, expansion_basis_data, reference_state):
+        if isinstance(self.qubit_mapper, TaperedQubitMapper):
+            return super()._build_qeom_pseudoeigenvalue_problem(
+                untap_operator, expansion_basis_data, reference_state
+            )
+        hopping_ops, _, size = expansion_basis_data
+        circuit, values = reference_state
+        psi = Statevector(circuit.assign_parameters(values) if len(values) else circuit).data
+
+        hamiltonian = PauliHamiltonian(untap_operator)
+        h_psi = hamiltonian.apply(psi[None, :])[0]
+        paulis, coeffs = pauli_basis([hopping_ops[f"E_{k}"] for k in range(size)])
+        applied = apply_paulis(paulis, np.stack([psi, h_psi]))
+        e = {
+            'op': coeffs @ applied[:, 0], 'dag': coeffs.conj() @ applied[:, 0],
+            'op_h': coeffs @ applied[:, 1], 'dag_h': coeffs.conj() @ applied[:, 1],
+        }
+        e['h_op'] = hamiltonian.apply(e['op'])
+        e['h_dag'] = hamiltonian.apply(e['dag'])
+        # the same vectors seen from E^dag
+        e_dag = {'op': e['dag'], 'dag': e['op'], 'h_op': e['h_dag'],
+                 'op_h': e['dag_h'], 'dag_h': e['op_h']}
+
+        q_mat = np.triu(-double_commutators(e, e))
+        w_mat = np.triu(-commutators(e, e))
+        m_mat = np.triu(double_commutators(e, e_dag))
+        v_mat = np.triu(commutators(e, e_dag))
+
+        # Same symmetrization rules as QEOM._build_eom_matrices:
+        # M, V hermitian, Q symmetric, W antisymmetric
+        q_mat = np.real(q_mat + q_mat.T - np.diag(np.diag(q_mat)))
+        w_mat = np.real(w_mat - w_mat.T - np.diag(np.diag(w_mat)))
+        m_mat = np.real(m_mat + m_mat.T.conj() - np.diag(np.diag(m_mat)))
+        v_mat = np.real(v_mat + v_mat.T.conj() - np.diag(np.diag(v_mat)))
+
+        h_mat = np.block([[m_mat, q_mat], [q_mat.T.conj(), m_mat.T]])
+        s_mat = np.block([[v_mat, w_mat], [w_mat.T.conj(), -v_mat.T]])
+        # exact statevector evaluation, no sampling error
+        return h_mat, s_mat, np.zeros((2, 2)), np.zeros((2, 2))
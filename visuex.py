@@ -1,10 +1,14 @@
-from ase.build import molecule
-from ase.visualize import view
-
-water = molecule('H2O')
-view(water)
 from pyscf import gto, scf
-import matplotlib.pyplot as plt
+
+import render
+
+# The ASE viewer only opens in interactive runs (see render.MODE)
+if render.MODE == 'show':
+    from ase.build import molecule
+    from ase.visualize import view
+
+    water = molecule('H2O')
+    view(water)
 
 # Define H2 molecule using PySCF directly
 mol = gto.Mole()
@@ -20,12 +24,15 @@ mf.kernel()
 mo_energies = mf.mo_energy
 
 # Plot orbital energies
-plt.figure(figsize=(6, 4))
-for i, energy in enumerate(mo_energies):
-    plt.hlines(energy, i - 0.4, i + 0.4, colors='blue')
-plt.title("Molecular Orbital Energy Levels of H₂ (STO-3G)")
-plt.ylabel("Energy (Hartree)")
-plt.xlabel("Orbital index")
-plt.grid(True)
-plt.tight_layout()
-plt.show()
+def draw_orbitals(fig, mo_energies):
+    ax = fig.subplots()
+    for i, energy in enumerate(mo_energies):
+        ax.hlines(energy, i - 0.4, i + 0.4, colors='blue')
+    ax.set_title("Molecular Orbital Energy Levels of H₂ (STO-3G)")
+    ax.set_ylabel("Energy (Hartree)")
+    ax.set_xlabel("Orbital index")
+    ax.grid(True)
+    fig.tight_layout()
+
+render.figure('visuex_orbitals', draw_orbitals, mo_energies)
+render.finish()
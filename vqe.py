@@ -1,7 +1,9 @@
 from qiskit import QuantumCircuit
-from qiskit.quantum_info import SparsePauliOp, Statevector
+from qiskit.circuit import ParameterVector
+from qiskit.quantum_info import SparsePauliOp
 from scipy.optimize import minimize
 import numpy as np
+from compiled_ansatz import CompiledEnergy
 
 # Define the Hamiltonian H = Z₀Z₁ + X₀
 H = SparsePauliOp.from_list([
@@ -17,16 +19,26 @@ def ansatz(params):
     qc.cx(0, 1)
     return qc
 
+# Compile the parametrized ansatz and H once; every call then only runs the
+# NumPy gate kernels (a (batch, 2) array of params is evaluated in one pass)
+theta = ParameterVector('θ', 2)
+energy = CompiledEnergy(ansatz(theta), H)
+
 # Objective: Compute ⟨ψ(θ)|H|ψ(θ)⟩
 def expectation(params):
-    qc = ansatz(params)
-    state = Statevector.from_instruction(qc)
-    return np.real(state.expectation_value(H))
+    return energy(params)
+
+# Analytic ∂⟨H⟩/∂θ from one forward and one backward (adjoint) pass
+def gradient(params):
+    return energy.gradient(params)
 
 # Optimize parameters to minimize energy
-initial_params = [0.1, 0.1]
-result = minimize(expectation, initial_params, method='COBYLA')
+def run(initial_params=(0.1, 0.1)):
+    return minimize(expectation, list(initial_params), jac=gradient, method='BFGS')
+
+if __name__ == "__main__":
+    result = run()
 
-# Print optimal energy and parameters
-print("Optimal parameters:", result.x)
-print("Estimated ground state energy:", result.fun)
+    # Print optimal energy and parameters
+    print("Optimal parameters:", result.x)
+    print("Estimated ground state energy:", result.fun)
@@ -1,4 +1,4 @@
-from qiskit_nature.second_q.drivers import PySCFDriver
+from pyscf_cache import run_driver
 from qiskit_nature.units import DistanceUnit
 
 from qiskit_nature.second_q.mappers import ParityMapper
@@ -11,11 +11,10 @@ from qiskit import Aer
 from qiskit.utils import QuantumInstance
 from qiskit.opflow import StateFn, PauliExpectation
 
-# Step 1: Define the molecule
-driver = PySCFDriver(atom="H 0 0 0; H 0 0 0.735", 
-                     basis="sto3g", 
+# Step 1: Define the molecule (driver results are cached on disk)
+problem = run_driver(atom="H 0 0 0; H 0 0 0.735",
+                     basis="sto3g",
                      unit=DistanceUnit.ANGSTROM)
-problem = driver.run()
 
 # Step 2: Map to qubit Hamiltonian
 mapper = ParityMapper()